@@ -0,0 +1,176 @@
+"""Benchmarks for the balance and settlement engine.
+
+Run from the repository root; nothing here needs Qt or a display:
+
+    python -m benchmarks.bench_settlement            # quick tier
+    python -m benchmarks.bench_settlement --full     # up to 10k people / 1M expenses
+    python -m benchmarks.bench_settlement --update-baseline
+
+Results are written as JSON and compared with benchmarks/baseline.json. Any
+time or peak memory more than --tolerance above the baseline is reported as
+a regression and makes the exit status non-zero.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import generate_trip
+from src.services.money import currency_exponent, iter_settlement_transactions_minor
+from src.services.vectorized_balances import HAS_NUMPY, participant_balances_minor
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+RESULTS_PATH = Path(__file__).with_name("results.json")
+
+# name -> (participants, expenses, exclusion_density, personal_ratio)
+QUICK_SCENARIOS = {
+    "10p-100e": (10, 100, 0.1, 0.1),
+    "10p-10ke": (10, 10_000, 0.1, 0.1),
+    "100p-1ke": (100, 1_000, 0.05, 0.1),
+    "100p-10ke": (100, 10_000, 0.05, 0.1),
+    "1kp-1ke": (1_000, 1_000, 0.01, 0.1),
+    "10kp-100e": (10_000, 100, 0.001, 0.1),
+}
+# Equal splits touch every participant, so the largest groups and the
+# largest expense counts are benchmarked separately rather than multiplied
+FULL_SCENARIOS = {
+    **QUICK_SCENARIOS,
+    "10p-1me": (10, 1_000_000, 0.1, 0.1),
+    "100p-100ke": (100, 100_000, 0.05, 0.1),
+    "1kp-100ke": (1_000, 100_000, 0.01, 0.1),
+    "10kp-10ke": (10_000, 10_000, 0.001, 0.1),
+}
+
+# metric -> smallest absolute increase worth reporting, to ignore timer noise
+METRICS = {
+    "balances_s": 0.005,
+    "settlements_s": 0.005,
+    "balances_peak_kib": 64,
+    "settlements_peak_kib": 64,
+}
+
+
+def _best_time(function, args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_kib(function, args) -> float:
+    """Peak memory allocated while the function runs, in KiB"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _settlements(balances):
+    return list(iter_settlement_transactions_minor(balances))
+
+
+def run_scenario(participants, expenses, exclusion_density, personal_ratio, repeat):
+    trip = generate_trip(participants, expenses, exclusion_density, personal_ratio)
+    args = (
+        trip["participants"],
+        trip["expenses"],
+        currency_exponent(trip["currency"]),
+    )
+    balances = participant_balances_minor(*args)
+
+    # Tracing slows allocation down, so memory is measured in separate runs
+    return {
+        "participants": participants,
+        "expenses": expenses,
+        "balances_s": _best_time(participant_balances_minor, args, repeat),
+        "settlements_s": _best_time(_settlements, (balances,), repeat),
+        "balances_peak_kib": _peak_kib(participant_balances_minor, args),
+        "settlements_peak_kib": _peak_kib(_settlements, (balances,)),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than the tolerance"""
+    regressions = []
+    for name, measured in results["scenarios"].items():
+        expected = baseline.get("scenarios", {}).get(name)
+        if not expected:
+            continue
+        for metric, noise in METRICS.items():
+            before = expected.get(metric)
+            after = measured.get(metric)
+            if before is None or after is None:
+                continue
+            if after - before > max(before * tolerance, noise):
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="run the large tier")
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    scenarios = FULL_SCENARIOS if args.full else QUICK_SCENARIOS
+    if args.only:
+        scenarios = {name: scenarios[name] for name in args.only}
+
+    results = {
+        "python": platform.python_version(),
+        "numpy": HAS_NUMPY,
+        "scenarios": {},
+    }
+    for name, config in scenarios.items():
+        measured = run_scenario(*config, repeat=args.repeat)
+        results["scenarios"][name] = measured
+        print(
+            f"{name:>12}  balances {measured['balances_s']:9.4f}s"
+            f" {measured['balances_peak_kib']:11.0f} KiB"
+            f"  settlements {measured['settlements_s']:9.4f}s"
+            f" {measured['settlements_peak_kib']:9.0f} KiB"
+        )
+
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.update_baseline:
+        # Scenarios that were not run keep their old baseline numbers
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+            baseline.update({k: v for k, v in results.items() if k != "scenarios"})
+            baseline["scenarios"].update(results["scenarios"])
+        else:
+            baseline = results
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"Warning: No baseline at {args.baseline}; nothing to compare")
+        return 0
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for name, metric, before, after in regressions:
+        print(f"REGRESSION {name} {metric}: {before:.4f} -> {after:.4f}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
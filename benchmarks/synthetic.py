@@ -0,0 +1,53 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+
+
+def generate_trip(
+    participants: int,
+    expenses: int,
+    exclusion_density: float = 0.05,
+    personal_ratio: float = 0.1,
+    seed: int = 0,
+) -> Dict:
+    """A reproducible trip in the shape TripManager keeps in memory.
+
+    exclusion_density is the share of (expense, participant) pairs excluded
+    from equal splits, and personal_ratio the share of personal expenses.
+    The same arguments always give the same trip, ids included.
+    """
+    rng = random.Random(seed)
+    people = [{"id": f"p{i}", "name": f"Person {i}"} for i in range(participants)]
+    ids = [p["id"] for p in people]
+    start = datetime(2024, 1, 1)
+
+    generated = []
+    for i in range(expenses):
+        expense = {
+            "id": f"e{i}",
+            "title": f"Expense {i}",
+            "amount": rng.randint(1, 50000) / 100,
+            "paid_by": rng.choice(ids),
+            "split_type": "equal",
+            "excluded": [],
+            "created_at": (start + timedelta(seconds=i * 60)).isoformat(),
+        }
+        if rng.random() < personal_ratio:
+            expense["split_type"] = "personal"
+        elif exclusion_density > 0:
+            # Stochastic rounding keeps the expected count without a draw
+            # per participant; at least one person stays in every split
+            count = int(exclusion_density * participants + rng.random())
+            count = min(count, participants - 1)
+            expense["excluded"] = rng.sample(ids, count)
+        generated.append(expense)
+
+    return {
+        "id": f"trip-{seed}",
+        "name": f"Synthetic {participants}x{expenses}",
+        "currency": "USD",
+        "created_at": start.isoformat(),
+        "updated_at": start.isoformat(),
+        "participants": people,
+        "expenses": generated,
+    }
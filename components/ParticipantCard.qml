@@ -13,6 +13,10 @@ ItemDelegate {
     property real totalPaid: 0
     property real shouldPay: 0
     property real balance: 0
+    // Preformatted amounts, e.g. from the balance model; balanceText is unsigned
+    property string totalPaidText: formatAmount(totalPaid)
+    property string shouldPayText: formatAmount(shouldPay)
+    property string balanceText: formatAmount(Math.abs(balance))
 
     signal deleteParticipant
 
@@ -74,7 +78,7 @@ ItemDelegate {
                         opacity: 0.6
                     }
                     Label {
-                        text: currencySymbol + formatAmount(totalPaid)
+                        text: currencySymbol + totalPaidText
                         font.pixelSize: 15
                         font.weight: Font.Medium
                     }
@@ -101,7 +105,7 @@ ItemDelegate {
                         opacity: 0.6
                     }
                     Label {
-                        text: currencySymbol + formatAmount(shouldPay)
+                        text: currencySymbol + shouldPayText
                         font.pixelSize: 15
                         font.weight: Font.Medium
                     }
@@ -158,8 +162,7 @@ ItemDelegate {
                 }
 
                 Label {
-                    text: balance === 0 ? "✓" : currencySymbol + formatAmount(
-                                              Math.abs(balance))
+                    text: balance === 0 ? "✓" : currencySymbol + balanceText
                     font.pixelSize: balance === 0 ? 18 : 16
                     font.weight: Font.Bold
                     Layout.alignment: Qt.AlignRight
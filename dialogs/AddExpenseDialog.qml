@@ -2,6 +2,7 @@ import QtQuick
 import QtQuick.Controls
 import QtQuick.Layouts
 import QtQuick.Controls.Material
+import "../components"
 import "../popups"
 
 Dialog {
@@ -13,9 +14,12 @@ Dialog {
     padding: 24
 
     property var excludedIds: []
+    property var splitData: ({})
+    // Trip currency by default; expenses may be logged in another one
+    property string currency: ""
     property var participantModel
 
-    signal expenseCreated(string expenseTitle, int expenseAmount, string paidById, string splitType, var excludedIds)
+    signal expenseCreated(string expenseTitle, int expenseAmount, string paidById, string splitType, var excludedIds, var splitData, string currency)
 
     Overlay.modal: Rectangle {
         color: Material.dropShadowColor
@@ -42,6 +46,12 @@ Dialog {
             font.pixelSize: 15
         }
 
+        CurrencyComboBox {
+            id: currencyField
+            Layout.fillWidth: true
+            currentCode: root.currency
+        }
+
         ColumnLayout {
             spacing: 4
             Label {
@@ -75,7 +85,7 @@ Dialog {
             ComboBox {
                 id: splitTypeField
                 implicitHeight: 45
-                model: ["equal", "personal"]
+                model: ["equal", "personal", "shares", "percent", "exact"]
             }
         }
 
@@ -83,6 +93,7 @@ Dialog {
             id: excludeBtn
             text: "Manage excluded participants"
                   + (excludedIds.length > 0 ? " (" + excludedIds.length + ")" : "")
+            visible: ["equal", "personal"].includes(splitTypeField.currentValue)
             flat: true
             icon.source: "qrc:/icons/block.svg"
             icon.color: Material.color(Material.Red)
@@ -100,6 +111,27 @@ Dialog {
             Component.onCompleted: pointerCursor.createObject(this)
         }
 
+        Button {
+            text: "Set split values"
+                  + (splitData.ids && splitData.ids.length > 0 ? " (" + splitData.ids.length + ")" : "")
+            visible: ["shares", "percent", "exact"].includes(splitTypeField.currentValue)
+            flat: true
+            icon.source: "qrc:/icons/group.svg"
+            onClicked: {
+                splitValuesPopup.splitType = splitTypeField.currentValue
+                splitValuesPopup.splitData = root.splitData
+                splitValuesPopup.open()
+            }
+
+            background: Rectangle {
+                color: ApplicationWindow.window.cardBackground
+                radius: 12
+                border.color: ApplicationWindow.window.cardBorder
+                border.width: 1
+            }
+            Component.onCompleted: pointerCursor.createObject(this)
+        }
+
         Button {
             text: "Add Expense"
             Layout.fillWidth: true
@@ -113,9 +145,14 @@ Dialog {
                                         parseFloat(amountField.text) || 0.00,
                                         paidByField.currentValue,
                                         splitTypeField.currentValue,
-                                        root.excludedIds)
+                                        root.excludedIds,
+                                        excludeBtn.visible ? {} : root.splitData,
+                                        currencyField.currentIndex >= 0
+                                        ? currencyField.model[currencyField.currentIndex].code
+                                        : root.currency)
                     titleField.clear()
                     amountField.clear()
+                    root.splitData = {}
                     root.close()
                 }
             }
@@ -123,6 +160,11 @@ Dialog {
         }
     }
 
+    onOpened: {
+        currencyField.currentIndex = currencyField.model.map(c => c.code).indexOf(
+                    root.currency)
+    }
+
     ParticipantMultiSelectPopup {
         id: excludePopup
         width: root.width * 0.85
@@ -134,4 +176,16 @@ Dialog {
             root.excludedIds = ids
         }
     }
+
+    SplitValuesPopup {
+        id: splitValuesPopup
+        width: root.width * 0.85
+        height: participantModel ? Math.min(participantModel.rowCount(
+                                                ) * 55 + 90, 360) : 200
+
+        participantModel: root.participantModel
+        onAccepted: function (data) {
+            root.splitData = data
+        }
+    }
 }
@@ -2,6 +2,7 @@ import QtQuick
 import QtQuick.Controls
 import QtQuick.Layouts
 import QtQuick.Controls.Material
+import "../components"
 import "../popups"
 
 Dialog {
@@ -18,10 +19,13 @@ Dialog {
     property string paidById: ""
     property string splitType: "equal"
     property var excludedIds: []
+    property var splitData: ({})
+    // Trip currency by default; expenses may be logged in another one
+    property string currency: ""
 
     property var participantModel
 
-    signal expenseEdited(string expenseId, string expenseTitle, real expenseAmount, string paidById, string splitType, var excludedIds)
+    signal expenseEdited(string expenseId, string expenseTitle, real expenseAmount, string paidById, string splitType, var excludedIds, var splitData, string currency)
 
     Overlay.modal: Rectangle {
         color: Material.dropShadowColor
@@ -48,6 +52,12 @@ Dialog {
             font.pixelSize: 15
         }
 
+        CurrencyComboBox {
+            id: currencyField
+            Layout.fillWidth: true
+            currentCode: root.currency
+        }
+
         ColumnLayout {
             spacing: 4
             Label {
@@ -81,7 +91,10 @@ Dialog {
             ComboBox {
                 id: splitTypeField
                 implicitHeight: 50
-                model: ["equal", "personal"]
+                // Itemized splits are kept as they are, but not edited here
+                model: root.splitType === "itemized"
+                       ? ["equal", "personal", "shares", "percent", "exact", "itemized"]
+                       : ["equal", "personal", "shares", "percent", "exact"]
             }
         }
 
@@ -89,6 +102,7 @@ Dialog {
             id: excludeBtn
             text: "Manage excluded participants"
                   + (excludedIds.length > 0 ? " (" + excludedIds.length + ")" : "")
+            visible: ["equal", "personal"].includes(splitTypeField.currentValue)
             flat: true
             icon.source: "qrc:/icons/block.svg"
             icon.color: Material.color(Material.Red)
@@ -106,6 +120,27 @@ Dialog {
             Component.onCompleted: pointerCursor.createObject(this)
         }
 
+        Button {
+            text: "Set split values"
+                  + (splitData.ids && splitData.ids.length > 0 ? " (" + splitData.ids.length + ")" : "")
+            visible: ["shares", "percent", "exact"].includes(splitTypeField.currentValue)
+            flat: true
+            icon.source: "qrc:/icons/group.svg"
+            onClicked: {
+                splitValuesPopup.splitType = splitTypeField.currentValue
+                splitValuesPopup.splitData = root.splitData
+                splitValuesPopup.open()
+            }
+
+            background: Rectangle {
+                color: ApplicationWindow.window.cardBackground
+                radius: 12
+                border.color: ApplicationWindow.window.cardBorder
+                border.width: 1
+            }
+            Component.onCompleted: pointerCursor.createObject(this)
+        }
+
         RowLayout {
             Layout.fillWidth: true
             spacing: 12
@@ -131,7 +166,11 @@ Dialog {
                                            parseFloat(amountField.text)
                                            || 0.00, paidByField.currentValue,
                                            splitTypeField.currentValue,
-                                           root.excludedIds)
+                                           root.excludedIds,
+                                           excludeBtn.visible ? {} : root.splitData,
+                                           currencyField.currentIndex >= 0
+                                           ? currencyField.model[currencyField.currentIndex].code
+                                           : root.currency)
                         root.close()
                     }
                 }
@@ -152,11 +191,25 @@ Dialog {
         }
     }
 
+    SplitValuesPopup {
+        id: splitValuesPopup
+        width: root.width * 0.85
+        height: participantModel ? Math.min(participantModel.rowCount(
+                                                ) * 55 + 90, 360) : 200
+
+        participantModel: root.participantModel
+        onAccepted: function (data) {
+            root.splitData = data
+        }
+    }
+
     onOpened: {
         titleField.text = expenseTitle
         amountField.text = expenseAmount
         paidByField.currentIndex = participantModel.indexOfId(paidById)
         splitTypeField.currentIndex = splitTypeField.model.indexOf(splitType)
         excludedIds = excludedIds.slice()
+        currencyField.currentIndex = currencyField.model.map(c => c.code).indexOf(
+                    currency)
     }
 }
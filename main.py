@@ -18,6 +18,7 @@ if __name__ == "__main__":
     settings_manager = SettingsManager()
     trip_manager = TripManager()
     file_actions = FileSystemActions()
+    settings_manager.settlementModeChanged.connect(trip_manager.refreshSettlements)
 
     engine = QQmlApplicationEngine()
     engine.rootContext().setContextProperty("settingsManager", settings_manager)
@@ -88,6 +88,29 @@ ApplicationWindow {
         initialItem: HomePage {}
     }
 
+    // Failed saves are kept and retried by the trip store
+    Connections {
+        target: tripManager
+        function onSaveFailed(message) {
+            saveErrorLabel.text = "Changes not saved yet, retrying: " + message
+            saveErrorPopup.open()
+        }
+    }
+
+    Popup {
+        id: saveErrorPopup
+        x: (parent.width - width) / 2
+        y: parent.height - height - 24
+        padding: 16
+
+        Label {
+            id: saveErrorLabel
+            width: Math.min(implicitWidth, app.width - 64)
+            wrapMode: Text.Wrap
+            color: Material.color(Material.Red)
+        }
+    }
+
     // Global pointer cursor component
     Component {
         id: pointerCursor
@@ -90,6 +90,35 @@ Page {
                     checked: settingsManager ? settingsManager.theme === "dark" : false
                     onTriggered: settingsManager.setTheme("dark")
                 }
+
+                MenuSeparator {}
+                Label {
+                    text: "Settlements"
+                    font.pixelSize: 12
+                    opacity: 0.6
+                    leftPadding: 16
+                    topPadding: 8
+                    bottomPadding: 4
+                }
+
+                MenuItem {
+                    text: "Quick (greedy)"
+                    checkable: true
+                    checked: settingsManager ? settingsManager.settlementMode === "greedy" : false
+                    onTriggered: settingsManager.setSettlementMode("greedy")
+                }
+                MenuItem {
+                    text: "Fewest transfers"
+                    checkable: true
+                    checked: settingsManager ? settingsManager.settlementMode === "minimal" : false
+                    onTriggered: settingsManager.setSettlementMode("minimal")
+                }
+                MenuItem {
+                    text: "Between people who shared expenses"
+                    checkable: true
+                    checked: settingsManager ? settingsManager.settlementMode === "graph" : false
+                    onTriggered: settingsManager.setSettlementMode("graph")
+                }
             }
         }
     }
@@ -214,7 +243,8 @@ Page {
                     onEditTrip: {
                         editTripDialog.tripId = id
                         editTripDialog.tripName = name
-                        editTripDialog.participants = participants
+                        editTripDialog.participants = tripManager.getTripParticipants(
+                                    id)
                         editTripDialog.tripCurrency = currency
                         editTripDialog.open()
                     }
@@ -299,7 +299,7 @@ Page {
 
                         Label {
                             anchors.centerIn: parent
-                            text: expenseList.count + " items"
+                            text: (tripManager ? tripManager.expenseCount : 0) + " items"
                             opacity: 0.7
                             font.pixelSize: 11
                             font.weight: Font.Medium
@@ -323,11 +323,11 @@ Page {
                         expenseTitle: title
                         expenseAmount: amount
                         expenseIcon: "💵"
-                        paidBy: participantModel ? participantModel.nameOfId(
-                                                       paid_by) : "Participant ID: " + paid_by
+                        paidBy: payer_name
                         splitType: split_type
                         excludedIds: excluded
-                        tripCurrencySymbol: root.currencySymbol
+                        tripCurrencySymbol: currency ? settingsManager.getCurrencySymbol(
+                                                           currency) : root.currencySymbol
                         participantCount: root.participantCount
                         onEditExpense: {
                             editExpenseDialog.expenseId = id
@@ -336,6 +336,8 @@ Page {
                             editExpenseDialog.paidById = paid_by
                             editExpenseDialog.splitType = split_type
                             editExpenseDialog.excludedIds = excluded.slice()
+                            editExpenseDialog.splitData = split_data
+                            editExpenseDialog.currency = currency || root.tripCurrency
                             editExpenseDialog.open()
                         }
                         onDeleteExpense: {
@@ -415,19 +417,20 @@ Page {
                     spacing: 10
                     clip: true
 
-                    model: root.participantModel
+                    model: tripManager ? tripManager.balanceModel : null
 
                     delegate: ParticipantCard {
                         width: ListView.view.width
 
-                        property var participantBalance: tripManager.getParticipantBalance(
-                                                             id)
                         participantName: name
                         currencySymbol: root.currencySymbol
 
-                        totalPaid: participantBalance ? participantBalance.total_paid : 0
-                        shouldPay: participantBalance ? participantBalance.should_pay : 0
-                        balance: participantBalance ? participantBalance.balance : 0
+                        totalPaid: total_paid
+                        shouldPay: should_pay
+                        balance: model.balance
+                        totalPaidText: total_paid_text
+                        shouldPayText: should_pay_text
+                        balanceText: balance_text
 
                         onDeleteParticipant: {
                             deleteParticipantDialog.participantId = id
@@ -497,6 +500,15 @@ Page {
                     }
                 }
 
+                Label {
+                    text: "Computed with " + tripManager.settlementAlgorithm
+                    visible: tripManager.settlementAlgorithm !== ""
+                    Layout.leftMargin: 16
+                    Layout.bottomMargin: 4
+                    font.pixelSize: 11
+                    opacity: 0.6
+                }
+
                 ListView {
                     id: settlementList
                     Layout.fillWidth: true
@@ -506,15 +518,14 @@ Page {
                     spacing: 10
                     clip: true
 
-                    model: ListModel {
-                        id: settlementModel
-                    }
+                    // Pages in more transfers as the list is scrolled
+                    model: tripManager.settlementModel
 
                     delegate: SettlementCard {
                         width: ListView.view.width
                         debtor: model.from_name
                         creditor: model.to_name
-                        amount: formatAmount(model.amount)
+                        amount: model.amount_text
                         currencySymbol: root.currencySymbol
                     }
                 }
@@ -524,12 +535,6 @@ Page {
 
     Component.onCompleted: {
         tripManager.setActiveTrip(tripId)
-
-        let suggestions = tripManager ? tripManager.getSuggestedSettlements(
-                                            ) : []
-        for (let suggestion of suggestions) {
-            settlementModel.append(suggestion)
-        }
     }
 
     ToastPopup {
@@ -558,18 +563,20 @@ Page {
     AddExpenseDialog {
         id: addExpenseDialog
         participantModel: root.participantModel
-        onExpenseCreated: function (expenseTitle, expenseAmount, paidBy, split_type, excluded) {
+        currency: root.tripCurrency
+        onExpenseCreated: function (expenseTitle, expenseAmount, paidBy, split_type, excluded, splitData, currency) {
             tripManager.addExpense(expenseTitle, expenseAmount, paidBy,
-                                   split_type, excluded)
+                                   split_type, excluded, splitData, currency)
         }
     }
 
     EditExpenseDialog {
         id: editExpenseDialog
         participantModel: root.participantModel
-        onExpenseEdited: function (expenseId, expenseTitle, expenseAmount, paidBy, split_type, excluded) {
+        onExpenseEdited: function (expenseId, expenseTitle, expenseAmount, paidBy, split_type, excluded, splitData, currency) {
             tripManager.editExpense(expenseId, expenseTitle, expenseAmount,
-                                    paidBy, split_type, excluded)
+                                    paidBy, split_type, excluded, splitData,
+                                    currency)
         }
     }
 
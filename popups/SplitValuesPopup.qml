@@ -0,0 +1,104 @@
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import QtQuick.Controls.Material
+
+Popup {
+    id: control
+    modal: true
+    focus: true
+    padding: 24
+    anchors.centerIn: parent
+
+    // "shares", "percent" or "exact"
+    property string splitType: "shares"
+    // {"ids": [...], "values": [...]}, parallel arrays
+    property var splitData: ({})
+    property var participantModel
+
+    signal accepted(var splitData)
+
+    function valueOf(participantId) {
+        const ids = splitData.ids || []
+        const i = ids.indexOf(participantId)
+        return i >= 0 ? splitData.values[i] : ""
+    }
+
+    function setValue(participantId, value) {
+        const ids = (splitData.ids || []).slice()
+        const values = (splitData.values || []).slice()
+        const i = ids.indexOf(participantId)
+        if (i >= 0) {
+            ids.splice(i, 1)
+            values.splice(i, 1)
+        }
+        if (value > 0) {
+            ids.push(participantId)
+            values.push(value)
+        }
+        splitData = {
+            "ids": ids,
+            "values": values
+        }
+    }
+
+    background: Rectangle {
+        radius: 12
+        color: Material.dialogColor
+    }
+
+    Overlay.modal: Rectangle {
+        color: Material.dropShadowColor
+    }
+
+    ColumnLayout {
+        anchors.fill: parent
+        spacing: 8
+
+        Label {
+            text: control.splitType === "percent" ? "Percentage per participant" : control.splitType
+                                                    === "exact" ? "Amount per participant" : "Shares per participant"
+            font.pixelSize: 14
+            font.weight: Font.Medium
+        }
+
+        ListView {
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            clip: true
+            model: control.participantModel ?? null
+
+            delegate: RowLayout {
+                width: parent.width
+                spacing: 12
+
+                Label {
+                    text: name
+                    Layout.fillWidth: true
+                    elide: Text.ElideRight
+                }
+
+                TextField {
+                    Layout.preferredWidth: 90
+                    implicitHeight: 45
+                    placeholderText: "0"
+                    inputMethodHints: Qt.ImhFormattedNumbersOnly
+                    text: control.valueOf(model.id)
+                    onEditingFinished: control.setValue(model.id,
+                                                        parseFloat(text) || 0)
+                }
+            }
+        }
+
+        Button {
+            text: "Done"
+            Layout.fillWidth: true
+            highlighted: true
+            onClicked: {
+                control.accepted(control.splitData)
+                control.close()
+            }
+            Component.onCompleted: pointerCursor.createObject(this)
+        }
+    }
+}
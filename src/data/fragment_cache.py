@@ -0,0 +1,30 @@
+import json
+from typing import Dict, List, Tuple
+
+
+class TripFragmentCache:
+    """Caches each trip's encoded JSON keyed by its revision.
+
+    Building a snapshot of every trip then only re-encodes trips whose
+    revision moved since the last snapshot; untouched trips are joined in
+    from their cached fragments.
+    """
+
+    def __init__(self):
+        self._fragments: Dict[str, Tuple[int, str]] = {}
+
+    def encode(self, trips: List[Dict], revisions: Dict[str, int]) -> str:
+        """Return the JSON array of all trips, reusing unchanged fragments"""
+        fragments = {}
+        parts = []
+        for trip in trips:
+            revision = revisions.get(trip["id"], 0)
+            cached = self._fragments.get(trip["id"])
+            if cached is None or cached[0] != revision:
+                cached = (revision, json.dumps(trip))
+            fragments[trip["id"]] = cached
+            parts.append(cached[1])
+
+        # Deleted trips fall out of the cache here
+        self._fragments = fragments
+        return "[" + ",".join(parts) + "]"
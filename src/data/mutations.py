@@ -0,0 +1,81 @@
+from typing import Dict, List, Tuple
+
+# A mutation is (op, trip_id, payload); op names a storage operation
+Mutation = Tuple[str, str, object]
+
+OPERATIONS = {
+    "add_trip",
+    "update_trip",
+    "delete_trip",
+    "set_participants",
+    "add_participant",
+    "update_participant",
+    "delete_participant",
+    "add_expense",
+    "update_expense",
+    "delete_expense",
+}
+
+
+def import_mutations(trips: List[Dict]) -> List[Mutation]:
+    """Expand trips in the legacy single-list format into mutations"""
+    mutations = []
+    for trip in trips:
+        mutations.append(("add_trip", trip["id"], trip))
+        for expense in trip.get("expenses", []):
+            mutations.append(("add_expense", trip["id"], expense))
+    return mutations
+
+
+def apply_mutation(trips: List[Dict], index: Dict[str, Dict], mutation: Mutation):
+    """Apply one mutation to an in-memory trip list and its id index"""
+    op, trip_id, payload = mutation
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown trip mutation '{op}'")
+
+    if op == "add_trip":
+        trip = dict(payload, participants=list(payload.get("participants", [])))
+        trip["expenses"] = []
+        trips.append(trip)
+        index[trip_id] = trip
+        return
+
+    trip = index.get(trip_id)
+    if trip is None:
+        return
+
+    if op == "update_trip":
+        for key in ("name", "currency", "updated_at"):
+            if key in payload:
+                trip[key] = payload[key]
+    elif op == "delete_trip":
+        trips.remove(trip)
+        del index[trip_id]
+    elif op == "set_participants":
+        trip["participants"] = list(payload)
+    elif op == "add_participant":
+        trip["participants"].append(payload)
+    elif op == "update_participant":
+        _replace_by_id(trip["participants"], payload)
+    elif op == "delete_participant":
+        _remove_by_id(trip["participants"], payload)
+    elif op == "add_expense":
+        trip["expenses"].append(payload)
+    elif op == "update_expense":
+        _replace_by_id(trip["expenses"], payload)
+    elif op == "delete_expense":
+        _remove_by_id(trip["expenses"], payload)
+
+
+def _replace_by_id(items: List[Dict], item: Dict):
+    for i, existing in enumerate(items):
+        if existing["id"] == item["id"]:
+            items[i] = dict(existing, **item)
+            return
+
+
+def _remove_by_id(items: List[Dict], item_id: str):
+    for i, existing in enumerate(items):
+        if existing["id"] == item_id:
+            items.pop(i)
+            return
@@ -0,0 +1,102 @@
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"ESNP"
+FORMAT_VERSION = 1
+
+# magic, format version, payload length, CRC32 of the payload
+HEADER = struct.Struct("<4sHQI")
+CHUNK_SIZE = 1024 * 1024
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file fails validation"""
+
+
+class SnapshotStore:
+    """Crash-safe snapshot files kept as a rotating set of generations.
+
+    Each write goes to a temp file that is fsynced and atomically renamed to
+    ``<name>.0``; older generations shift to ``.1`` .. ``.N-1``. Files carry a
+    header with format version, payload length and CRC32, which the loader
+    checks in a streaming pass before handing the payload to the parser.
+    """
+
+    def __init__(self, directory, name: str = "snapshot", generations: int = 3):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._name = name
+        self._generations = max(1, generations)
+
+    def _path(self, generation: int) -> Path:
+        return self._dir / f"{self._name}.{generation}"
+
+    def write(self, data: bytes):
+        """Write a new generation and rotate the older ones"""
+        tmp_path = self._dir / f"{self._name}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(data), zlib.crc32(data)))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        for generation in range(self._generations - 1, 0, -1):
+            older = self._path(generation - 1)
+            if older.exists():
+                os.replace(older, self._path(generation))
+        os.replace(tmp_path, self._path(0))
+        self._sync_directory()
+
+    def read(self) -> Optional[bytes]:
+        """Return the newest generation that validates, or None if there is none"""
+        for generation in range(self._generations):
+            path = self._path(generation)
+            if not path.exists():
+                continue
+            try:
+                self.validate(path)
+            except SnapshotError as e:
+                print(f"Warning: Skipping snapshot {path.name}: {e}")
+                continue
+            with open(path, "rb") as f:
+                f.seek(HEADER.size)
+                return f.read()
+        return None
+
+    @staticmethod
+    def validate(path):
+        """Check header and checksum without holding the payload in memory"""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise SnapshotError("truncated header")
+            magic, version, length, checksum = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise SnapshotError("not a snapshot file")
+            if version > FORMAT_VERSION:
+                raise SnapshotError(f"unsupported format version {version}")
+
+            crc = 0
+            remaining = length
+            while remaining:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise SnapshotError("truncated payload")
+                crc = zlib.crc32(chunk, crc)
+                remaining -= len(chunk)
+            if f.read(1):
+                raise SnapshotError("trailing data")
+        if crc != checksum:
+            raise SnapshotError("checksum mismatch")
+
+    def _sync_directory(self):
+        if os.name != "posix":
+            return
+        fd = os.open(self._dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .fragment_cache import TripFragmentCache
+from .mutations import Mutation, apply_mutation, import_mutations
+from .snapshot_store import SnapshotStore
+
+JOURNAL_FILE = "journal.log"
+SEGMENT_PATTERN = "journal.*.log"
+
+
+class TripJournal:
+    """Append-only mutation log on top of a periodically compacted snapshot.
+
+    Every record is one JSON line ``[seq, op, trip_id, payload]``. The
+    snapshot stores the sequence number it covers, so replay skips records
+    that were already folded in and a crash mid-compaction never applies a
+    mutation twice. A per-trip revision counter lets snapshots re-encode only
+    the trips that changed since the previous one.
+
+    Compaction rotates the log into a ``journal.<seq>.log`` segment. Segments
+    are kept as long as an older snapshot generation may need them, so
+    falling back past a corrupt snapshot still replays up to the last record.
+    """
+
+    def __init__(
+        self,
+        directory,
+        compact_threshold: int = 4 * 1024 * 1024,
+        fsync_batch: int = 32,
+        fsync_interval: float = 1.0,
+        generations: int = 3,
+    ):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._compact_threshold = compact_threshold
+        self._fsync_batch = fsync_batch
+        self._fsync_interval = fsync_interval
+        self._generations = generations
+        self._snapshots = SnapshotStore(self._dir, generations=generations)
+
+        self._lock = threading.Lock()
+        self._compaction = None
+        self._trips: List[Dict] = []
+        self._index: Dict[str, Dict] = {}
+        self._revisions: Dict[str, int] = {}
+        self._fragments = TripFragmentCache()
+        self._newest_first: Dict[str, tuple] = {}
+        self._seq = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        snapshot_seq = self._replay()
+        self._log = open(self._dir / JOURNAL_FILE, "a", encoding="utf-8")
+
+        segments = self._segments()
+        if segments and self._segment_seq(segments[-1]) > snapshot_seq:
+            # A compaction never finished or its snapshot was unreadable
+            self._compact(self._encode_snapshot())
+
+    # ── Reads ────────────────────────────────────────────────
+
+    def _segments(self) -> List[Path]:
+        return sorted(self._dir.glob(SEGMENT_PATTERN))
+
+    @staticmethod
+    def _segment_seq(path: Path) -> int:
+        return int(path.name.split(".")[1])
+
+    def _replay(self) -> int:
+        """Load the newest valid snapshot and replay newer records on top"""
+        snapshot_seq = 0
+        data = self._snapshots.read()
+        if data is not None:
+            snapshot = json.loads(data)
+            snapshot_seq = snapshot["seq"]
+            self._trips = snapshot["trips"]
+            self._index = {trip["id"]: trip for trip in self._trips}
+        self._seq = snapshot_seq
+
+        for path in self._segments() + [self._dir / JOURNAL_FILE]:
+            if not path.exists():
+                continue
+            name = path.name
+            valid_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        seq, op, trip_id, payload = json.loads(line)
+                    except ValueError:
+                        # Torn write at the tail of the log; drop it so new
+                        # records start on a clean line
+                        print("Warning: Ignoring truncated journal record in", name)
+                        break
+                    valid_bytes += len(line)
+                    if seq <= snapshot_seq:
+                        continue
+                    apply_mutation(self._trips, self._index, (op, trip_id, payload))
+                    self._seq = seq
+            if valid_bytes < path.stat().st_size:
+                os.truncate(path, valid_bytes)
+        return snapshot_seq
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._trips
+
+    def load_trips(self) -> List[Dict]:
+        """Return a copy of every trip as of the last journal record"""
+        with self._lock:
+            return json.loads(json.dumps(self._trips))
+
+    def load_index(self) -> List[Dict]:
+        """Return trip headers with participant counts but no bodies"""
+        with self._lock:
+            return [
+                {
+                    "id": trip["id"],
+                    "name": trip["name"],
+                    "currency": trip["currency"],
+                    "participant_count": len(trip["participants"]),
+                    "created_at": trip["created_at"],
+                    "updated_at": trip["updated_at"],
+                }
+                for trip in self._trips
+            ]
+
+    def load_trip(self, trip_id: str) -> Dict:
+        """Return a copy of the participants and expenses of a single trip"""
+        with self._lock:
+            trip = self._index.get(trip_id, {})
+            body = {
+                "participants": trip.get("participants", []),
+                "expenses": trip.get("expenses", []),
+            }
+            return json.loads(json.dumps(body))
+
+    def load_expense(self, trip_id: str, expense_id: str):
+        """Return a copy of one expense of a trip, or None"""
+        with self._lock:
+            for expense in self._index.get(trip_id, {}).get("expenses", []):
+                if expense["id"] == expense_id:
+                    return json.loads(json.dumps(expense))
+        return None
+
+    def count_expenses(self, trip_id: str) -> int:
+        with self._lock:
+            return len(self._index.get(trip_id, {}).get("expenses", []))
+
+    def load_expense_page(self, trip_id: str, offset: int, limit: int) -> List[Dict]:
+        """Return a copy of a slice of a trip's expenses, newest created_at first"""
+        with self._lock:
+            order = self._expense_order(trip_id)
+            page = order[offset : offset + limit]
+            return json.loads(json.dumps(page))
+
+    def _expense_order(self, trip_id: str) -> List[Dict]:
+        # The sorted order is kept until the trip's revision moves on
+        revision = self._revisions.get(trip_id, 0)
+        cached = self._newest_first.get(trip_id)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        expenses = self._index.get(trip_id, {}).get("expenses", [])
+        # Stable, so of two equal stamps the later appended comes first; the
+        # reversed list is usually sorted already, which timsort takes in O(n)
+        order = sorted(
+            reversed(expenses),
+            key=lambda expense: expense.get("created_at", ""),
+            reverse=True,
+        )
+        self._newest_first[trip_id] = (revision, order)
+        return order
+
+    def load_participants(self) -> List[Dict]:
+        """Return the participants of every trip, each tagged with its trip_id"""
+        with self._lock:
+            return [
+                dict(participant, trip_id=trip["id"])
+                for trip in self._trips
+                for participant in trip["participants"]
+            ]
+
+    # ── Writes ───────────────────────────────────────────────
+
+    def apply(self, mutations: Iterable[Mutation]):
+        """Append the mutations to the journal, one record per line"""
+        with self._lock:
+            for op, trip_id, payload in mutations:
+                self._seq += 1
+                line = json.dumps(
+                    [self._seq, op, trip_id, payload], separators=(",", ":")
+                )
+                self._log.write(line + "\n")
+                # Apply the decoded record so memory matches what replay yields
+                apply_mutation(self._trips, self._index, json.loads(line)[1:])
+                self._revisions[trip_id] = self._revisions.get(trip_id, 0) + 1
+                self._unsynced += 1
+
+            self._log.flush()
+            self._sync_if_due()
+            if self._log.tell() >= self._compact_threshold:
+                self._start_compaction()
+
+    def import_trips(self, trips: List[Dict]):
+        """Bulk append trips in the legacy single-list format"""
+        self.apply(import_mutations(trips))
+
+    def _sync_if_due(self, force=False):
+        now = time.monotonic()
+        if not self._unsynced:
+            return
+        if (
+            force
+            or self._unsynced >= self._fsync_batch
+            or now - self._last_sync >= self._fsync_interval
+        ):
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+            self._last_sync = now
+
+    def close(self):
+        if self._compaction:
+            self._compaction.join()
+        with self._lock:
+            self._sync_if_due(force=True)
+            self._log.close()
+
+    # ── Compaction ───────────────────────────────────────────
+
+    def _start_compaction(self):
+        """Rotate the log and write a fresh snapshot in the background"""
+        if self._compaction and self._compaction.is_alive():
+            return
+
+        self._sync_if_due(force=True)
+        self._log.close()
+        segment = self._dir / f"journal.{self._seq:012d}.log"
+        os.replace(self._dir / JOURNAL_FILE, segment)
+        self._log = open(self._dir / JOURNAL_FILE, "a", encoding="utf-8")
+
+        data = self._encode_snapshot()
+        self._compaction = threading.Thread(
+            target=self._compact, args=(data,), name="TripJournalCompaction"
+        )
+        self._compaction.start()
+
+    def _encode_snapshot(self) -> str:
+        trips = self._fragments.encode(self._trips, self._revisions)
+        return f'{{"seq": {self._seq}, "trips": {trips}}}'
+
+    def _compact(self, data: str):
+        self._snapshots.write(data.encode("utf-8"))
+
+        # Generation k needs the segments written after it to catch up
+        segments = self._segments()
+        for path in segments[: max(0, len(segments) - (self._generations - 1))]:
+            path.unlink()
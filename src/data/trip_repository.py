@@ -0,0 +1,358 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+from .mutations import OPERATIONS, Mutation, import_mutations
+
+SCHEMA_VERSION = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trips (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS participants (
+    trip_id TEXT NOT NULL REFERENCES trips(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    person_id TEXT,
+    PRIMARY KEY (trip_id, id)
+);
+
+CREATE INDEX IF NOT EXISTS participants_person ON participants(person_id);
+
+CREATE TABLE IF NOT EXISTS expenses (
+    trip_id TEXT NOT NULL REFERENCES trips(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    amount REAL NOT NULL,
+    paid_by TEXT,
+    split_type TEXT NOT NULL,
+    excluded TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    split_data TEXT,
+    currency TEXT,
+    PRIMARY KEY (trip_id, id)
+);
+
+CREATE INDEX IF NOT EXISTS expenses_created ON expenses(trip_id, created_at);
+"""
+
+# Upgrades from the previous schema version, keyed by the version they produce
+MIGRATIONS = {
+    2: """
+ALTER TABLE participants ADD COLUMN person_id TEXT;
+CREATE INDEX IF NOT EXISTS participants_person ON participants(person_id);
+""",
+    3: """
+ALTER TABLE expenses ADD COLUMN split_data TEXT;
+""",
+    4: """
+ALTER TABLE expenses ADD COLUMN currency TEXT;
+""",
+    5: """
+CREATE INDEX IF NOT EXISTS expenses_created ON expenses(trip_id, created_at);
+""",
+}
+
+
+class TripRepository:
+    """SQLite-backed storage for trips, participants and expenses.
+
+    Rows keep their insertion order through the implicit rowid, so lists come
+    back in the same order the app appended them.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+
+    def _create_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            if version == 0:
+                self._conn.executescript(SCHEMA)
+            else:
+                for target in range(version + 1, SCHEMA_VERSION + 1):
+                    self._conn.executescript(MIGRATIONS[target])
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ── Reads ────────────────────────────────────────────────
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM trips LIMIT 1").fetchone()
+        return row is None
+
+    def load_trips(self) -> List[Dict]:
+        """Load every trip with its participants and expenses"""
+        with self._lock:
+            trips = [
+                self._trip_from_row(row)
+                for row in self._conn.execute("SELECT * FROM trips ORDER BY rowid")
+            ]
+            by_id = {trip["id"]: trip for trip in trips}
+
+            for row in self._conn.execute("SELECT * FROM participants ORDER BY rowid"):
+                by_id[row["trip_id"]]["participants"].append(
+                    self._participant_from_row(row)
+                )
+            for row in self._conn.execute("SELECT * FROM expenses ORDER BY rowid"):
+                by_id[row["trip_id"]]["expenses"].append(self._expense_from_row(row))
+        return trips
+
+    def load_index(self) -> List[Dict]:
+        """Load trip headers with participant counts but no bodies"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT trips.*, (SELECT COUNT(*) FROM participants"
+                " WHERE participants.trip_id = trips.id) AS participant_count"
+                " FROM trips ORDER BY rowid"
+            ).fetchall()
+        return [self._index_from_row(row) for row in rows]
+
+    def load_trip(self, trip_id: str) -> Dict:
+        """Load the participants and expenses of a single trip"""
+        with self._lock:
+            participants = [
+                self._participant_from_row(row)
+                for row in self._conn.execute(
+                    "SELECT * FROM participants WHERE trip_id = ? ORDER BY rowid",
+                    (trip_id,),
+                )
+            ]
+            expenses = [
+                self._expense_from_row(row)
+                for row in self._conn.execute(
+                    "SELECT * FROM expenses WHERE trip_id = ? ORDER BY rowid",
+                    (trip_id,),
+                )
+            ]
+        return {"participants": participants, "expenses": expenses}
+
+    def load_expense(self, trip_id: str, expense_id: str):
+        """Load one expense of a trip, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM expenses WHERE trip_id = ? AND id = ?",
+                (trip_id, expense_id),
+            ).fetchone()
+        return self._expense_from_row(row) if row is not None else None
+
+    def count_expenses(self, trip_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM expenses WHERE trip_id = ?", (trip_id,)
+            ).fetchone()
+        return row[0]
+
+    def load_expense_page(self, trip_id: str, offset: int, limit: int) -> List[Dict]:
+        """Load a slice of a trip's expenses, newest created_at first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM expenses WHERE trip_id = ?"
+                " ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?",
+                (trip_id, limit, offset),
+            ).fetchall()
+        return [self._expense_from_row(row) for row in rows]
+
+    def load_participants(self) -> List[Dict]:
+        """Load the participants of every trip, each tagged with its trip_id"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM participants ORDER BY rowid"
+            ).fetchall()
+        return [
+            dict(self._participant_from_row(row), trip_id=row["trip_id"])
+            for row in rows
+        ]
+
+    @staticmethod
+    def _index_from_row(row) -> Dict:
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "currency": row["currency"],
+            "participant_count": row["participant_count"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    @staticmethod
+    def _trip_from_row(row) -> Dict:
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "currency": row["currency"],
+            "participants": [],
+            "expenses": [],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    @staticmethod
+    def _participant_from_row(row) -> Dict:
+        participant = {"id": row["id"], "name": row["name"]}
+        if row["person_id"]:
+            participant["person_id"] = row["person_id"]
+        return participant
+
+    @staticmethod
+    def _expense_from_row(row) -> Dict:
+        expense = {
+            "id": row["id"],
+            "title": row["title"],
+            "amount": row["amount"],
+            "paid_by": row["paid_by"],
+            "split_type": row["split_type"],
+            "excluded": json.loads(row["excluded"]),
+            "created_at": row["created_at"],
+        }
+        if row["split_data"]:
+            expense["split_data"] = json.loads(row["split_data"])
+        if row["currency"]:
+            expense["currency"] = row["currency"]
+        return expense
+
+    # ── Writes ───────────────────────────────────────────────
+
+    def apply(self, mutations: Iterable[Mutation]):
+        """Apply a batch of mutations in a single transaction"""
+        with self._lock, self._conn:
+            for op, trip_id, payload in mutations:
+                if op not in OPERATIONS:
+                    raise ValueError(f"Unknown trip mutation '{op}'")
+                getattr(self, f"_{op}")(trip_id, payload)
+
+    def import_trips(self, trips: List[Dict]):
+        """Bulk insert trips in the legacy single-list format"""
+        self.apply(import_mutations(trips))
+
+    def _add_trip(self, trip_id, trip):
+        now = trip.get("updated_at") or trip.get("created_at", "")
+        self._conn.execute(
+            "INSERT INTO trips (id, name, currency, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                trip_id,
+                trip["name"],
+                trip.get("currency", "NGN"),
+                trip.get("created_at", now),
+                now,
+            ),
+        )
+        self._set_participants(trip_id, trip.get("participants", []))
+
+    def _update_trip(self, trip_id, fields):
+        columns = [key for key in ("name", "currency", "updated_at") if key in fields]
+        if not columns:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        self._conn.execute(
+            f"UPDATE trips SET {assignments} WHERE id = ?",
+            [fields[column] for column in columns] + [trip_id],
+        )
+
+    def _delete_trip(self, trip_id, _payload):
+        self._conn.execute("DELETE FROM trips WHERE id = ?", (trip_id,))
+
+    def _set_participants(self, trip_id, participants):
+        self._conn.execute("DELETE FROM participants WHERE trip_id = ?", (trip_id,))
+        self._conn.executemany(
+            "INSERT INTO participants (trip_id, id, name, person_id)"
+            " VALUES (?, ?, ?, ?)",
+            [(trip_id, p["id"], p["name"], p.get("person_id")) for p in participants],
+        )
+
+    def _add_participant(self, trip_id, participant):
+        self._conn.execute(
+            "INSERT INTO participants (trip_id, id, name, person_id)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                trip_id,
+                participant["id"],
+                participant["name"],
+                participant.get("person_id"),
+            ),
+        )
+
+    def _update_participant(self, trip_id, participant):
+        self._conn.execute(
+            "UPDATE participants SET name = ?, person_id = ?"
+            " WHERE trip_id = ? AND id = ?",
+            (
+                participant["name"],
+                participant.get("person_id"),
+                trip_id,
+                participant["id"],
+            ),
+        )
+
+    def _delete_participant(self, trip_id, participant_id):
+        self._conn.execute(
+            "DELETE FROM participants WHERE trip_id = ? AND id = ?",
+            (trip_id, participant_id),
+        )
+
+    def _add_expense(self, trip_id, expense):
+        self._conn.execute(
+            "INSERT INTO expenses (trip_id, id, title, amount, paid_by, split_type,"
+            " excluded, created_at, split_data, currency)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                trip_id,
+                expense["id"],
+                expense["title"],
+                expense["amount"],
+                expense.get("paid_by"),
+                expense.get("split_type", "equal"),
+                json.dumps(expense.get("excluded", [])),
+                expense.get("created_at", ""),
+                _encode_split_data(expense),
+                expense.get("currency"),
+            ),
+        )
+
+    def _update_expense(self, trip_id, expense):
+        self._conn.execute(
+            "UPDATE expenses SET title = ?, amount = ?, paid_by = ?, split_type = ?,"
+            " excluded = ?, split_data = ?, currency = ? WHERE trip_id = ? AND id = ?",
+            (
+                expense["title"],
+                expense["amount"],
+                expense.get("paid_by"),
+                expense.get("split_type", "equal"),
+                json.dumps(expense.get("excluded", [])),
+                _encode_split_data(expense),
+                expense.get("currency"),
+                trip_id,
+                expense["id"],
+            ),
+        )
+
+    def _delete_expense(self, trip_id, expense_id):
+        self._conn.execute(
+            "DELETE FROM expenses WHERE trip_id = ? AND id = ?",
+            (trip_id, expense_id),
+        )
+
+
+def _encode_split_data(expense: Dict):
+    split_data = expense.get("split_data")
+    return json.dumps(split_data) if split_data else None
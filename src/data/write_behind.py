@@ -0,0 +1,240 @@
+import copy
+import threading
+from typing import Dict, Iterable, List
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from .mutations import Mutation
+
+# Ops that only overwrite fields, so a later one can be merged into an earlier one
+_UPDATE_OPS = {"update_trip", "update_participant", "update_expense"}
+
+
+class _ApplyTask(QRunnable):
+    def __init__(self, writer, mutations):
+        super().__init__()
+        self._writer = writer
+        self._mutations = mutations
+
+    def run(self):
+        self._writer._apply_batch(self._mutations)
+
+
+class _ReadTask(QRunnable):
+    def __init__(self, store, read):
+        super().__init__()
+        self._store = store
+        self._read = read
+
+    def run(self):
+        self._read(self._store)
+
+
+class WriteBehindStore(QObject):
+    """Debounces mutations and applies them to a trip store off the GUI thread.
+
+    Mutations recorded within ``delay_ms`` of each other are written as one
+    batch on a single-thread pool, which keeps batches in order. Payloads are
+    copied when recorded, so callers may keep mutating their own dicts.
+
+    A batch the store rejects is kept, along with every batch after it, and
+    written again ahead of newer mutations after ``retry_ms``. Each failure
+    is reported through saveFailed. After ``max_retries`` failed attempts
+    the mutations are written one at a time instead; any that still fail
+    are dropped and reported, so one bad mutation cannot hold back the rest.
+    """
+
+    saveFailed = Signal(str)
+
+    def __init__(
+        self,
+        store,
+        delay_ms: int = 300,
+        retry_ms: int = 5000,
+        max_retries: int = 3,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._store = store
+        self._max_retries = max_retries
+        self._pending: List[Mutation] = []
+        self._update_slots: Dict[tuple, int] = {}
+
+        self._dirty_lock = threading.Lock()
+        self._dirty: Dict[str, int] = {}
+        self._failed: List[Mutation] = []
+        self._failures = 0
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._submit_pending)
+
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.setInterval(retry_ms)
+        self._retry_timer.timeout.connect(self._submit_pending)
+        # Emitted from the pool thread, so this runs queued on the GUI thread
+        self.saveFailed.connect(self._retry_timer.start)
+
+    # ── Store interface ──────────────────────────────────────
+
+    def is_empty(self) -> bool:
+        self.flush()
+        return self._store.is_empty()
+
+    def load_trips(self) -> List[Dict]:
+        self.flush()
+        return self._store.load_trips()
+
+    def load_index(self) -> List[Dict]:
+        self.flush()
+        return self._store.load_index()
+
+    def load_trip(self, trip_id: str) -> Dict:
+        if self.is_dirty(trip_id):
+            self.flush()
+        return self._store.load_trip(trip_id)
+
+    def load_expense(self, trip_id: str, expense_id: str):
+        if self.is_dirty(trip_id):
+            self.flush()
+        return self._store.load_expense(trip_id, expense_id)
+
+    def count_expenses(self, trip_id: str) -> int:
+        if self.is_dirty(trip_id):
+            self.flush()
+        return self._store.count_expenses(trip_id)
+
+    def load_expense_page(self, trip_id: str, offset: int, limit: int) -> List[Dict]:
+        if self.is_dirty(trip_id):
+            self.flush()
+        return self._store.load_expense_page(trip_id, offset, limit)
+
+    def load_participants(self) -> List[Dict]:
+        self.flush()
+        return self._store.load_participants()
+
+    def import_trips(self, trips: List[Dict]):
+        self.flush()
+        self._store.import_trips(trips)
+
+    def apply(self, mutations: Iterable[Mutation]):
+        """Queue mutations and (re)start the debounce window"""
+        for op, trip_id, payload in mutations:
+            self._record(op, trip_id, copy.deepcopy(payload))
+        self._timer.start()
+
+    def close(self):
+        self.flush()
+        if self._failed:
+            # No later retry will come; save what can be saved one by one
+            with self._dirty_lock:
+                self._failures = self._max_retries
+            self.flush()
+        self._store.close()
+
+    # ── Write-behind ─────────────────────────────────────────
+
+    def is_dirty(self, trip_id: str) -> bool:
+        """Whether the trip has writes that have not reached the store yet"""
+        with self._dirty_lock:
+            return trip_id in self._dirty or any(
+                mutation[1] == trip_id for mutation in self._failed + self._pending
+            )
+
+    def read_after_writes(self, read):
+        """Call read(store) on the writer thread once queued writes are done.
+
+        Lets the GUI thread read a trip in the background without waiting
+        for a flush; read runs on the pool thread, not the caller's.
+        """
+        self._timer.stop()
+        self._submit_pending()
+        self._pool.start(_ReadTask(self._store, read))
+
+    def flush(self):
+        """Write everything queued so far and wait until it is on disk"""
+        self._timer.stop()
+        self._submit_pending()
+        self._pool.waitForDone()
+
+    def _record(self, op, trip_id, payload):
+        item_id = payload.get("id") if isinstance(payload, dict) else None
+        key = (op, trip_id, item_id)
+
+        if op in _UPDATE_OPS and key in self._update_slots:
+            self._pending[self._update_slots[key]][2].update(payload)
+            return
+
+        if op not in _UPDATE_OPS:
+            # Anything else may depend on the order of earlier updates
+            self._update_slots = {
+                k: i for k, i in self._update_slots.items() if k[1] != trip_id
+            }
+        else:
+            self._update_slots[key] = len(self._pending)
+        self._pending.append((op, trip_id, payload))
+
+    def _submit_pending(self):
+        if self._failed:
+            # Let batches queued behind the failed one join it, keeping order
+            self._pool.waitForDone()
+        with self._dirty_lock:
+            batch = self._failed + self._pending
+            self._failed = []
+        if not batch:
+            return
+        self._retry_timer.stop()
+        self._pending = []
+        self._update_slots = {}
+
+        with self._dirty_lock:
+            for trip_id in {mutation[1] for mutation in batch}:
+                self._dirty[trip_id] = self._dirty.get(trip_id, 0) + 1
+        self._pool.start(_ApplyTask(self, batch))
+
+    def _apply_batch(self, batch: List[Mutation]):
+        error = None
+        with self._dirty_lock:
+            held_back = bool(self._failed)
+            one_by_one = self._failures >= self._max_retries
+        if held_back:
+            # An earlier batch failed; writing this one first would reorder them
+            error = "an earlier batch was not saved"
+        elif one_by_one:
+            self._apply_one_by_one(batch)
+        else:
+            try:
+                self._store.apply(batch)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        with self._dirty_lock:
+            if not held_back:
+                self._failures = self._failures + 1 if error is not None else 0
+            if error is not None:
+                self._failed.extend(batch)
+            for trip_id in {mutation[1] for mutation in batch}:
+                self._dirty[trip_id] -= 1
+                if not self._dirty[trip_id]:
+                    del self._dirty[trip_id]
+        if error is not None and not held_back:
+            print("Warning: Failed to save trips, will retry:", error)
+            self.saveFailed.emit(error)
+
+    def _apply_one_by_one(self, batch: List[Mutation]):
+        """Write mutations singly, dropping and reporting any the store rejects"""
+        for mutation in batch:
+            try:
+                self._store.apply([mutation])
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(
+                    f"Warning: Dropped a {mutation[0]} for trip {mutation[1]}:", error
+                )
+                self.saveFailed.emit(
+                    f"A change to trip {mutation[1]} could not be saved: {error}"
+                )
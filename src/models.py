@@ -1,39 +1,204 @@
 from PySide6.QtCore import (
     QAbstractListModel,
+    QAbstractTableModel,
+    QLocale,
     QModelIndex,
     QSortFilterProxyModel,
     Qt,
     Slot,
 )
+from itertools import islice
 
 
-class TripModel(QAbstractListModel):
+def _format_amount(amount: float, decimals: int) -> str:
+    """An amount with the locale's separators, as QML's toLocaleString gives"""
+    return QLocale().toString(float(amount), "f", decimals)
+
+
+class _KeyedListModel(QAbstractListModel):
+    """List model over dicts keyed by "id", updated row by row.
+
+    Mutations go through the model so views get targeted inserts, removals,
+    moves and dataChanged signals instead of a reset that rebuilds every
+    delegate. Role names match the dict keys, which is how changed keys are
+    turned into changed roles.
+
+    An id -> row index is kept alongside the rows. Appends and removals at
+    the end update it in place; other structural changes drop it, and it is
+    rebuilt on the next lookup.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._index = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def _reset_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self._index = None
+        self.endResetModel()
+
+    def _row_of(self, item_id: str) -> int:
+        if self._index is None:
+            self._index = {item["id"]: row for row, item in enumerate(self._rows)}
+        row = self._index.get(item_id, -1)
+        if row >= len(self._rows) or (row >= 0 and self._rows[row]["id"] != item_id):
+            # The shared list changed behind the model's back
+            self._index = None
+            return self._row_of(item_id)
+        return row
+
+    def itemOf(self, item_id: str):
+        """The dict with the given id, or None"""
+        row = self._row_of(item_id)
+        return self._rows[row] if row >= 0 else None
+
+    def _roles_of(self, keys):
+        roles = {name.decode(): role for role, name in self.roleNames().items()}
+        return [roles[key] for key in keys if key in roles]
+
+    def _insert_rows(self, row: int, items):
+        if not items:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+        if self._index is not None and row == len(self._rows):
+            self._index.update((item["id"], row + i) for i, item in enumerate(items))
+        else:
+            self._index = None
+        self._rows[row:row] = items
+        self.endInsertRows()
+
+    def _remove_rows(self, first: int, last: int):
+        self.beginRemoveRows(QModelIndex(), first, last)
+        if self._index is not None and last == len(self._rows) - 1:
+            for item in self._rows[first:]:
+                del self._index[item["id"]]
+        else:
+            self._index = None
+        del self._rows[first : last + 1]
+        self.endRemoveRows()
+
+    def _remove_id(self, item_id: str) -> bool:
+        row = self._row_of(item_id)
+        if row < 0:
+            return False
+        self._remove_rows(row, row)
+        return True
+
+    def _update_id(self, item_id: str, keys=None) -> bool:
+        """Report changed fields of a row; None means every role"""
+        row = self._row_of(item_id)
+        if row < 0:
+            return False
+        roles = self._roles_of(keys) if keys is not None else []
+        if keys is None or roles:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, roles)
+        return True
+
+    def _sync_rows(self, rows):
+        """Turn the shown rows into the given ones with the fewest signals.
+
+        Rows are matched by id: vanished ones are removed and new ones
+        inserted in contiguous runs, reordered ones are moved, and matched
+        rows report only the roles whose values differ. Dicts changed in
+        place cannot be compared, so those need _update_id instead.
+        """
+        wanted = {item["id"] for item in rows}
+        self._rows = current = list(self._rows)
+
+        row = len(current)
+        while row > 0:
+            row -= 1
+            if current[row]["id"] in wanted:
+                continue
+            last = row
+            while row > 0 and current[row - 1]["id"] not in wanted:
+                row -= 1
+            self._remove_rows(row, last)
+
+        present = {item["id"] for item in current}
+        row = 0
+        while row < len(rows):
+            item = rows[row]
+            if item["id"] not in present:
+                end = row + 1
+                while end < len(rows) and rows[end]["id"] not in present:
+                    end += 1
+                self._insert_rows(row, rows[row:end])
+                row = end
+                continue
+
+            if current[row]["id"] != item["id"]:
+                source = next(
+                    j
+                    for j in range(row + 1, len(current))
+                    if current[j]["id"] == item["id"]
+                )
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), row)
+                current.insert(row, current.pop(source))
+                self._index = None
+                self.endMoveRows()
+
+            old = current[row]
+            current[row] = item
+            keys = [
+                key for key in old.keys() | item.keys() if old.get(key) != item.get(key)
+            ]
+            roles = self._roles_of(keys)
+            if roles:
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, roles)
+            row += 1
+
+        self._rows = rows
+        self._index = None
+
+
+class TripModel(_KeyedListModel):
+    """The trip index shown on the home page, sharing TripManager's list"""
+
     IdRole = Qt.UserRole + 1
     NameRole = Qt.UserRole + 2
     ParticipantCountRole = Qt.UserRole + 3
-    ParticipantsRole = Qt.UserRole + 4
-    CurrencyRole = Qt.UserRole + 5
+    CurrencyRole = Qt.UserRole + 4
 
     def __init__(self, trips_list, parent=None):
         super().__init__(parent)
-        self._trips = trips_list
+        self._rows = trips_list
 
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._trips)
+    def setTrips(self, trips):
+        """Show another trip list, resetting the model"""
+        self._reset_rows(trips)
+
+    def appendTrip(self, trip):
+        self._insert_rows(len(self._rows), [trip])
+
+    def removeTrip(self, trip_id: str) -> bool:
+        return self._remove_id(trip_id)
+
+    def updateTrip(self, trip_id: str, keys=None) -> bool:
+        """Report that some fields of a trip changed; others are ignored"""
+        return self._update_id(trip_id, keys)
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._trips)):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
             return None
 
-        trip = self._trips[index.row()]
+        trip = self._rows[index.row()]
         if role == self.IdRole:
             return trip["id"]
         if role == self.NameRole:
             return trip["name"]
         if role == self.ParticipantCountRole:
-            return len(trip.get("participants", []))
-        if role == self.ParticipantsRole:
-            return trip.get("participants", [])
+            # Loaded trips carry their participants; others only the count
+            if "participants" in trip:
+                return len(trip["participants"])
+            return trip.get("participant_count", 0)
         if role == self.CurrencyRole:
             return trip["currency"]
         return None
@@ -43,23 +208,26 @@ class TripModel(QAbstractListModel):
             self.IdRole: b"id",
             self.NameRole: b"name",
             self.ParticipantCountRole: b"participant_count",
-            self.ParticipantsRole: b"participants",
             self.CurrencyRole: b"currency",
         }
 
-    def refresh(self):
-        self.beginResetModel()
-        self.endResetModel()
-
 
 class TripFilterProxy(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.setFilterRole(TripModel.NameRole)
+        # Re-filter only the rows a dataChanged signal reports
+        self.setDynamicSortFilter(True)
+
+
+class ExpenseModel(_KeyedListModel):
+    """The active trip's expenses.
 
+    The model shares its list with the trip, so the mutation methods change
+    the trip's expenses as well as notifying views.
+    """
 
-class ExpenseModel(QAbstractListModel):
     IdRole = Qt.UserRole + 1
     TitleRole = Qt.UserRole + 2
     AmountRole = Qt.UserRole + 3
@@ -67,25 +235,75 @@ class ExpenseModel(QAbstractListModel):
     SplitTypeRole = Qt.UserRole + 5
     ExcludedRole = Qt.UserRole + 6
     CreatedAtRole = Qt.UserRole + 7
+    SplitDataRole = Qt.UserRole + 8
+    CurrencyRole = Qt.UserRole + 9
+    PayerNameRole = Qt.UserRole + 10
 
-    def __init__(self, parent=None):
+    def __init__(self, participant_model=None, parent=None):
         super().__init__(parent)
-        self._expenses = []
+        # paid_by -> name, resolved through the participant model's index
+        self._payer_names = {}
+        self._participant_model = participant_model
+        if participant_model is not None:
+            participant_model.modelReset.connect(self._participants_changed)
+            participant_model.rowsRemoved.connect(self._participants_changed)
+            participant_model.dataChanged.connect(self._participants_changed)
+
+    def _participants_changed(self, *args):
+        """Drop cached payer names and let views fetch just that role again"""
+        self._payer_names.clear()
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, 0),
+                [self.PayerNameRole],
+            )
+
+    def _payer_name(self, participant_id: str) -> str:
+        name = self._payer_names.get(participant_id)
+        if name is None:
+            name = ""
+            if self._participant_model is not None:
+                name = self._participant_model.nameOfId(participant_id)
+            self._payer_names[participant_id] = name
+        return name
+
+    def _roles_of(self, keys):
+        roles = super()._roles_of(keys)
+        if self.PaidByRole in roles:
+            roles.append(self.PayerNameRole)
+        return roles
 
     def setExpenses(self, expenses):
-        """Update the expense list"""
-        self.beginResetModel()
-        self._expenses = expenses
-        self.endResetModel()
+        """Show another expense list, resetting the model"""
+        self._reset_rows(expenses)
 
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._expenses)
+    def syncExpenses(self, expenses):
+        """Replace the expense list through a keyed diff"""
+        self._sync_rows(expenses)
+
+    def appendExpense(self, expense):
+        self._insert_rows(len(self._rows), [expense])
+
+    def removeExpense(self, expense_id: str) -> bool:
+        return self._remove_id(expense_id)
+
+    def updateExpense(self, expense_id: str, keys=None) -> bool:
+        """Report that some fields of an expense changed in place"""
+        return self._update_id(expense_id, keys)
+
+    def totalCount(self) -> int:
+        """Number of expenses, including rows not fetched into the view yet"""
+        return len(self._rows)
+
+    def _expense_at(self, row: int):
+        return self._rows[row]
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._expenses)):
+        if not index.isValid() or not (0 <= index.row() < self.rowCount()):
             return None
 
-        expense = self._expenses[index.row()]
+        expense = self._expense_at(index.row())
         if role == self.IdRole:
             return expense["id"]
         if role == self.TitleRole:
@@ -100,6 +318,12 @@ class ExpenseModel(QAbstractListModel):
             return expense["excluded"]
         if role == self.CreatedAtRole:
             return expense.get("created_at", "")
+        if role == self.SplitDataRole:
+            return expense.get("split_data") or {}
+        if role == self.CurrencyRole:
+            return expense.get("currency") or ""
+        if role == self.PayerNameRole:
+            return self._payer_name(expense["paid_by"])
         return None
 
     def roleNames(self):
@@ -111,31 +335,201 @@ class ExpenseModel(QAbstractListModel):
             self.SplitTypeRole: b"split_type",
             self.ExcludedRole: b"excluded",
             self.CreatedAtRole: b"created_at",
+            self.SplitDataRole: b"split_data",
+            self.CurrencyRole: b"currency",
+            self.PayerNameRole: b"payer_name",
         }
 
 
-class ParticipantModel(QAbstractListModel):
-    IdRole = Qt.UserRole + 1
-    NameRole = Qt.UserRole + 2
+class PagedExpenseModel(ExpenseModel):
+    """The active trip's expenses, read from the trip store a page at a time.
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self._participants = []
+    Rows are ordered newest created_at first. Views grow the row count
+    through canFetchMore/fetchMore, and rows are read in pages of
+    ``page_size`` on first access. At most ``max_pages`` pages are kept;
+    the ones furthest from the page last read are dropped first.
 
-    def setParticipants(self, participants):
-        """Update the participant list"""
+    The model holds only its loaded pages, never the trip's whole list.
+    Mutations patch those pages in place, shifting the rows after the
+    change, so adding or removing an expense does not read the store.
+    """
+
+    def __init__(
+        self,
+        participant_model=None,
+        page_size: int = 100,
+        max_pages: int = 8,
+        parent=None,
+    ):
+        super().__init__(participant_model, parent)
+        self._page_size = max(page_size, 1)
+        self._max_pages = max(max_pages, 1)
+        self._store = None
+        self._trip_id = ""
+        self._total = 0
+        self._fetched = 0
+        self._pages = {}
+
+    def showTrip(self, store, trip_id: str):
+        """Show the first page of a trip's expenses straight from the store"""
         self.beginResetModel()
-        self._participants = participants
+        self._store = store
+        self._trip_id = trip_id
+        self._pages = {}
+        self._index = None
+        self._total = store.count_expenses(trip_id)
+        self._fetched = min(self._total, self._page_size)
         self.endResetModel()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self._participants)
+        return 0 if parent.isValid() else self._fetched
+
+    def totalCount(self) -> int:
+        return self._total
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        count = min(self._page_size, self._total - self._fetched)
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def _expense_at(self, row: int):
+        number, offset = divmod(row, self._page_size)
+        page = self._pages.get(number)
+        if page is None or page[offset] is None:
+            page = self._store.load_expense_page(
+                self._trip_id, number * self._page_size, self._page_size
+            )
+            self._pages[number] = page
+            while len(self._pages) > self._max_pages:
+                del self._pages[max(self._pages, key=lambda n: abs(n - number))]
+            self._index = None
+        return page[offset]
+
+    def _row_of(self, expense_id: str) -> int:
+        """Row of an expense in a loaded page, or -1"""
+        if self._index is None:
+            self._index = {
+                expense["id"]: number * self._page_size + offset
+                for number, page in self._pages.items()
+                for offset, expense in enumerate(page)
+                if expense is not None
+            }
+        return self._index.get(expense_id, -1)
+
+    def itemOf(self, expense_id: str):
+        """The loaded dict with the given id, or None if it is not loaded"""
+        row = self._row_of(expense_id)
+        if row < 0:
+            return None
+        number, offset = divmod(row, self._page_size)
+        return self._pages[number][offset]
+
+    def _shift_pages(self, row: int, expense=None):
+        """Insert expense at row, or remove the row if expense is None.
+
+        Loaded rows after it move by one. A row shifted in from a page
+        that is not loaded is left as None and read when first shown; pages
+        with no loaded rows left are dropped.
+        """
+        rows = {}
+        for number, page in self._pages.items():
+            for offset, item in enumerate(page):
+                at = number * self._page_size + offset
+                if item is None:
+                    continue
+                if at < row:
+                    rows[at] = item
+                elif expense is not None:
+                    rows[at + 1] = item
+                elif at > row:
+                    rows[at - 1] = item
+        numbers = set(self._pages)
+        if expense is not None:
+            rows[row] = expense
+            numbers.add(row // self._page_size)
+
+        self._pages = {}
+        for number in numbers:
+            start = number * self._page_size
+            page = [
+                rows.get(at)
+                for at in range(start, min(start + self._page_size, self._total))
+            ]
+            if any(item is not None for item in page):
+                self._pages[number] = page
+        self._index = None
+
+    def appendExpense(self, expense):
+        """Add an expense to the trip; new expenses are the newest, so row 0"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._total += 1
+        self._fetched += 1
+        self._shift_pages(0, expense)
+        self.endInsertRows()
+
+    def removeExpense(self, expense_id: str) -> bool:
+        row = self._row_of(expense_id)
+        if 0 <= row < self._fetched:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._total -= 1
+            self._fetched -= 1
+            self._shift_pages(row)
+            self.endRemoveRows()
+        else:
+            # Not shown, so its row is unknown and the view starts over
+            self.beginResetModel()
+            self._total -= 1
+            self._fetched = min(self._fetched, self._total)
+            self._pages = {}
+            self._index = None
+            self.endResetModel()
+        return True
+
+    def updateExpense(self, expense_id: str, keys=None) -> bool:
+        row = self._row_of(expense_id)
+        if 0 <= row < self._fetched:
+            roles = self._roles_of(keys) if keys is not None else []
+            if keys is None or roles:
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, roles)
+        return True
+
+
+class ParticipantModel(_KeyedListModel):
+    """The active trip's participants, sharing the trip's list"""
+
+    IdRole = Qt.UserRole + 1
+    NameRole = Qt.UserRole + 2
+
+    def setParticipants(self, participants):
+        """Show another participant list, resetting the model"""
+        self._reset_rows(participants)
+
+    def syncParticipants(self, participants):
+        """Replace the participant list through a keyed diff"""
+        self._sync_rows(participants)
+
+    def appendParticipant(self, participant):
+        self._insert_rows(len(self._rows), [participant])
+
+    def removeParticipant(self, participant_id: str) -> bool:
+        return self._remove_id(participant_id)
+
+    def updateParticipant(self, participant_id: str, keys=None) -> bool:
+        """Report that some fields of a participant changed in place"""
+        return self._update_id(participant_id, keys)
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._participants)):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
             return None
 
-        participant = self._participants[index.row()]
+        participant = self._rows[index.row()]
         if role == self.IdRole:
             return participant["id"]
         if role == self.NameRole:
@@ -151,24 +545,252 @@ class ParticipantModel(QAbstractListModel):
     @Slot(int, result=dict)
     def get(self, row):
         """Returns dict with all roles for given row"""
-        if not (0 <= row < len(self._participants)):
+        if not (0 <= row < len(self._rows)):
             return {}
 
-        participant = self._participants[row]
+        participant = self._rows[row]
         return {"id": participant["id"], "name": participant["name"]}
 
     @Slot(str, result=int)
     def indexOfId(self, participant_id: str):
         """Returns the index of the participant with the given ID, or -1 if not found"""
-        for row, participant in enumerate(self._participants):
-            if participant["id"] == participant_id:
-                return row
-        return -1
+        return self._row_of(participant_id)
 
     @Slot(str, result=str)
     def nameOfId(self, participant_id: str):
         """Returns the name of the participant with the given ID, or empty string if not found"""
-        for participant in self._participants:
-            if participant["id"] == participant_id:
-                return participant["name"]
-        return ""
+        participant = self.itemOf(participant_id)
+        return participant["name"] if participant else ""
+
+
+class DebtMatrixModel(QAbstractTableModel):
+    """Who owes whom before netting: row owes column"""
+
+    AmountRole = Qt.UserRole + 1
+    DebtorIdRole = Qt.UserRole + 2
+    CreditorIdRole = Qt.UserRole + 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._matrix = None
+
+    def setMatrix(self, matrix):
+        """Show a DebtMatrix, or nothing for None"""
+        self.beginResetModel()
+        self._matrix = matrix
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._matrix.ids) if self._matrix else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._matrix.ids) if self._matrix else 0
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not self._matrix:
+            return None
+
+        debtor, creditor = index.row(), index.column()
+        if role in (Qt.DisplayRole, self.AmountRole):
+            return self._matrix.to_major(self._matrix.owed_minor(debtor, creditor))
+        if role == self.DebtorIdRole:
+            return self._matrix.ids[debtor]
+        if role == self.CreditorIdRole:
+            return self._matrix.ids[creditor]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not self._matrix:
+            return None
+        if not (0 <= section < len(self._matrix.ids)):
+            return None
+        return self._matrix.name_of(section)
+
+    def roleNames(self):
+        return {
+            Qt.DisplayRole: b"display",
+            self.AmountRole: b"amount",
+            self.DebtorIdRole: b"debtor_id",
+            self.CreditorIdRole: b"creditor_id",
+        }
+
+
+class SettlementModel(QAbstractListModel):
+    """Suggested transfers, pulled from an iterator one page at a time.
+
+    Rows are (from_id, from_name, to_id, to_name, amount) tuples. Views ask
+    for more through canFetchMore/fetchMore as they scroll, so a long
+    settlement is never materialized before the first rows are shown. New
+    transfers are patched over the rows already shown, so only rows whose
+    values changed are reported.
+    """
+
+    FromIdRole = Qt.UserRole + 1
+    FromNameRole = Qt.UserRole + 2
+    ToIdRole = Qt.UserRole + 3
+    ToNameRole = Qt.UserRole + 4
+    AmountRole = Qt.UserRole + 5
+    AmountTextRole = Qt.UserRole + 6
+
+    PAGE_SIZE = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._source = None
+        self._decimals = 2
+
+    def setTransfers(self, transfers, decimals: int = 2):
+        """Show the transfers of an iterable, or nothing for None"""
+        source = iter(transfers) if transfers is not None else iter(())
+        # Refill as many rows as are shown, so the view keeps its place
+        wanted = max(len(self._rows), self.PAGE_SIZE)
+        rows = list(islice(source, wanted))
+        self._source = source if len(rows) == wanted else None
+
+        if decimals != self._decimals:
+            self._decimals = decimals
+            changed = range(min(len(rows), len(self._rows)))
+        else:
+            changed = [
+                i
+                for i, row in enumerate(rows[: len(self._rows)])
+                if row != self._rows[i]
+            ]
+        self._rows[: len(rows)] = rows
+        for row in changed:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [])
+
+        if len(self._rows) > len(rows):
+            self.beginRemoveRows(QModelIndex(), len(rows), len(self._rows) - 1)
+            del self._rows[len(rows) :]
+            self.endRemoveRows()
+        elif len(rows) > len(self._rows):
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(rows) - 1)
+            self._rows.extend(rows[len(self._rows) :])
+            self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._source is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._source is None:
+            return
+        page = list(islice(self._source, self.PAGE_SIZE))
+        if len(page) < self.PAGE_SIZE:
+            self._source = None
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+
+        from_id, from_name, to_id, to_name, amount = self._rows[index.row()]
+        if role == self.FromIdRole:
+            return from_id
+        if role == self.FromNameRole:
+            return from_name
+        if role == self.ToIdRole:
+            return to_id
+        if role == self.ToNameRole:
+            return to_name
+        if role == self.AmountRole:
+            return amount
+        if role == self.AmountTextRole:
+            return _format_amount(amount, self._decimals)
+        return None
+
+    def roleNames(self):
+        return {
+            self.FromIdRole: b"from_id",
+            self.FromNameRole: b"from_name",
+            self.ToIdRole: b"to_id",
+            self.ToNameRole: b"to_name",
+            self.AmountRole: b"amount",
+            self.AmountTextRole: b"amount_text",
+        }
+
+
+class BalanceModel(_KeyedListModel):
+    """Per-participant balances of the active trip.
+
+    Rows are balance dicts with the participant id added. New balances go
+    through the keyed diff, so only the amounts that moved are reported,
+    together with their formatted text.
+    """
+
+    IdRole = Qt.UserRole + 1
+    NameRole = Qt.UserRole + 2
+    TotalPaidRole = Qt.UserRole + 3
+    ShouldPayRole = Qt.UserRole + 4
+    BalanceRole = Qt.UserRole + 5
+    TotalPaidTextRole = Qt.UserRole + 6
+    ShouldPayTextRole = Qt.UserRole + 7
+    # Unsigned; views show the sign through colour
+    BalanceTextRole = Qt.UserRole + 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._decimals = 2
+
+    def setBalances(self, balances, decimals: int = 2):
+        """Show {participant_id: balance dict} as returned by the ledger"""
+        rows = [dict(data, id=pid) for pid, data in balances.items()]
+        if decimals != self._decimals:
+            self._decimals = decimals
+            self._reset_rows(rows)
+        else:
+            self._sync_rows(rows)
+
+    def _roles_of(self, keys):
+        roles = super()._roles_of(keys)
+        texts = {
+            self.TotalPaidRole: self.TotalPaidTextRole,
+            self.ShouldPayRole: self.ShouldPayTextRole,
+            self.BalanceRole: self.BalanceTextRole,
+        }
+        return roles + [texts[role] for role in roles if role in texts]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+
+        row = self._rows[index.row()]
+        if role == self.IdRole:
+            return row["id"]
+        if role == self.NameRole:
+            return row["name"]
+        if role == self.TotalPaidRole:
+            return row["total_paid"]
+        if role == self.ShouldPayRole:
+            return row["should_pay"]
+        if role == self.BalanceRole:
+            return row["balance"]
+        if role == self.TotalPaidTextRole:
+            return _format_amount(row["total_paid"], self._decimals)
+        if role == self.ShouldPayTextRole:
+            return _format_amount(row["should_pay"], self._decimals)
+        if role == self.BalanceTextRole:
+            return _format_amount(abs(row["balance"]), self._decimals)
+        return None
+
+    def roleNames(self):
+        return {
+            self.IdRole: b"id",
+            self.NameRole: b"name",
+            self.TotalPaidRole: b"total_paid",
+            self.ShouldPayRole: b"should_pay",
+            self.BalanceRole: b"balance",
+            self.TotalPaidTextRole: b"total_paid_text",
+            self.ShouldPayTextRole: b"should_pay_text",
+            self.BalanceTextRole: b"balance_text",
+        }
@@ -0,0 +1,95 @@
+import bisect
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List
+
+from .money import currency_exponent, from_minor, to_minor
+from .split_strategies import expense_allocation
+
+
+def to_epoch(timestamp: str) -> int:
+    """Whole seconds since the epoch for an ISO timestamp; 0 if unreadable"""
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+class BalanceHistory:
+    """Point-in-time balances of one trip from prefix sums over created_at.
+
+    Expenses are sorted by their created_at in epoch seconds, and every
+    participant keeps running totals of paid and owed minor units across
+    that order. Balances as of a moment are one bisect plus a read per
+    participant, and the amount spent in a time range is two bisects.
+    """
+
+    def __init__(
+        self,
+        participants: List[Dict],
+        expenses: List[Dict],
+        currency="",
+        converter=None,
+    ):
+        if converter is not None:
+            expenses = converter.convert_expenses(expenses, currency)
+        self._exponent = currency_exponent(currency)
+        self._names = {p["id"]: p["name"] for p in participants}
+        ids = list(self._names)
+        column = {pid: i for i, pid in enumerate(ids)}
+
+        # Stable sort, so expenses with equal stamps keep their list order
+        stamped = sorted(
+            ((to_epoch(e.get("created_at")), e) for e in expenses),
+            key=lambda pair: pair[0],
+        )
+        self.times = array("q", (stamp for stamp, _ in stamped))
+
+        spent = [0] * len(stamped)
+        paid = [[0] * len(stamped) for _ in ids]
+        owed = [[0] * len(stamped) for _ in ids]
+        for row, (_, expense) in enumerate(stamped):
+            amount = to_minor(expense.get("amount", 0), self._exponent)
+            spent[row] = amount
+            payer = column.get(expense.get("paid_by"))
+            if payer is not None:
+                paid[payer][row] = amount
+            indices, shares = expense_allocation(expense, column, self._exponent)
+            for i, share in zip(indices, shares):
+                owed[i][row] += share
+
+        self._spent = array("q", accumulate(spent, initial=0))
+        self._paid = {
+            pid: array("q", accumulate(paid[i], initial=0)) for i, pid in enumerate(ids)
+        }
+        self._owed = {
+            pid: array("q", accumulate(owed[i], initial=0)) for i, pid in enumerate(ids)
+        }
+
+    def _count_until(self, moment: int) -> int:
+        """Number of expenses created at or before the moment"""
+        return bisect.bisect_right(self.times, moment)
+
+    def balances_at(self, moment: int) -> Dict[str, Dict]:
+        """Balances counting only expenses created at or before the moment"""
+        k = self._count_until(moment)
+        balances = {}
+        for pid, name in self._names.items():
+            paid = self._paid[pid][k]
+            owed = self._owed[pid][k]
+            balances[pid] = {
+                "name": name,
+                "total_paid": from_minor(paid, self._exponent),
+                "should_pay": from_minor(owed, self._exponent),
+                "balance": from_minor(paid - owed, self._exponent),
+            }
+        return balances
+
+    def spent_between(self, start: int, end: int) -> float:
+        """Total of the expenses created from start to end, both inclusive"""
+        if end < start:
+            return 0.0
+        first = bisect.bisect_left(self.times, start)
+        last = self._count_until(end)
+        return from_minor(self._spent[last] - self._spent[first], self._exponent)
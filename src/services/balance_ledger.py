@@ -0,0 +1,192 @@
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from .debt_matrix import DebtMatrix
+from .money import (
+    currency_exponent,
+    from_minor,
+    iter_settlement_transactions_minor,
+    to_minor,
+)
+from .settlement_solver import GREEDY, solve_settlements
+from .split_strategies import expense_allocation, get_participant_balances_minor
+from .vectorized_balances import (
+    DENSE_DEBT_CELLS,
+    should_vectorize,
+    vectorized_totals_minor,
+)
+
+
+class BalanceLedger:
+    """Running per-participant totals for one trip, in integer minor units.
+
+    Expense changes are applied as deltas, so reading balances costs
+    O(participants) instead of a pass over every expense. Changes to the
+    participant list alter every equal split, so those rebuild the ledger.
+    The pairwise debts behind the totals are kept alongside in ``debts``.
+    Expenses in other currencies go through the optional converter first.
+    """
+
+    def __init__(
+        self,
+        participants: List[Dict],
+        expenses: List[Dict],
+        currency="",
+        converter=None,
+    ):
+        self.currency = currency
+        self._exponent = currency_exponent(currency)
+        self._converter = converter
+        self.rebuild(participants, expenses)
+
+    def _in_currency(self, expenses: List[Dict]) -> List[Dict]:
+        if self._converter is None:
+            return expenses
+        return self._converter.convert_expenses(expenses, self.currency)
+
+    def rebuild(self, participants: List[Dict], expenses: List[Dict]):
+        """Recompute every total from scratch"""
+        expenses = self._in_currency(expenses)
+        self._names = {p["id"]: p["name"] for p in participants}
+        self._ids = list(self._names)
+        self._column = {pid: i for i, pid in enumerate(self._ids)}
+        self._people = {p["id"]: p.get("person_id") for p in participants}
+        self.debts = DebtMatrix(participants, self._exponent)
+        self._spent = sum(
+            to_minor(expense.get("amount", 0), self._exponent) for expense in expenses
+        )
+
+        if should_vectorize(participants, expenses):
+            dense = len(participants) ** 2 <= DENSE_DEBT_CELLS
+            paid, owed, owed_to = vectorized_totals_minor(
+                participants, expenses, self._exponent, debts=dense
+            )
+            self._paid = {pid: int(paid[i]) for i, pid in enumerate(self._ids)}
+            self._owed = {pid: int(owed[i]) for i, pid in enumerate(self._ids)}
+            if dense:
+                self.debts.load_dense(owed_to)
+            else:
+                for expense in expenses:
+                    self.debts.add_expense(expense)
+            return
+
+        balances = get_participant_balances_minor(
+            participants, expenses, self._exponent
+        )
+        self._paid = {pid: data["total_paid"] for pid, data in balances.items()}
+        self._owed = {pid: data["should_pay"] for pid, data in balances.items()}
+        for expense in expenses:
+            self.debts.add_expense(expense)
+
+    def add_expense(self, expense: Dict):
+        self._apply(expense, 1)
+
+    def remove_expense(self, expense: Dict):
+        self._apply(expense, -1)
+
+    def _apply(self, expense: Dict, sign: int):
+        [expense] = self._in_currency([expense])
+        amount = to_minor(expense.get("amount", 0), self._exponent)
+        self._spent += sign * amount
+        paid_by = expense.get("paid_by")
+        if paid_by in self._paid:
+            self._paid[paid_by] += sign * amount
+
+        indices, shares = expense_allocation(expense, self._column, self._exponent)
+        for i, share in zip(indices, shares):
+            self._owed[self._ids[i]] += sign * share
+
+        if sign > 0:
+            self.debts.add_expense(expense)
+        else:
+            self.debts.remove_expense(expense)
+
+    def rename_participant(self, participant_id: str, name: str):
+        if participant_id in self._names:
+            self._names[participant_id] = name
+            self.debts.rename_participant(participant_id, name)
+
+    def link_person(self, participant_id: str, person_id: str):
+        if participant_id in self._people:
+            self._people[participant_id] = person_id or None
+
+    def person_balances_minor(self) -> Dict[str, Tuple[str, int]]:
+        """Net minor units per linked person as {person_id: (name, balance)}"""
+        people = {}
+        for pid, person_id in self._people.items():
+            if person_id:
+                _, balance = people.get(person_id, ("", 0))
+                balance += self._paid[pid] - self._owed[pid]
+                people[person_id] = (self._names[pid], balance)
+        return people
+
+    def is_consistent(self, participants: List[Dict]) -> bool:
+        """Check the ledger still covers exactly these participants"""
+        if len(participants) != len(self._names):
+            return False
+        return all(p["id"] in self._names for p in participants)
+
+    def balance_of(self, participant_id: str) -> Dict:
+        """Balance info for one participant, or None if unknown"""
+        if participant_id not in self._names:
+            return None
+        paid = self._paid[participant_id]
+        owed = self._owed[participant_id]
+        return {
+            "name": self._names[participant_id],
+            "total_paid": from_minor(paid, self._exponent),
+            "should_pay": from_minor(owed, self._exponent),
+            "balance": from_minor(paid - owed, self._exponent),
+        }
+
+    def total_spent(self) -> float:
+        """Sum of every expense in the trip currency, in major units"""
+        return from_minor(self._spent, self._exponent)
+
+    def balances(self) -> Dict[str, Dict]:
+        """Balances in the shape returned by get_participant_balances"""
+        return {pid: self.balance_of(pid) for pid in self._names}
+
+    def _minor_balances(self) -> Dict[str, Dict]:
+        return {
+            pid: {"name": name, "balance": self._paid[pid] - self._owed[pid]}
+            for pid, name in self._names.items()
+        }
+
+    def iter_settlements(self) -> Iterator[Tuple]:
+        """Greedy settlement transfers in major units, produced lazily.
+
+        The balances are taken when this is called, so later expense changes
+        do not leak into a half-consumed iterator.
+        """
+        transfers = iter_settlement_transactions_minor(self._minor_balances())
+        return (
+            (from_id, from_name, to_id, to_name, from_minor(amount, self._exponent))
+            for from_id, from_name, to_id, to_name, amount in transfers
+        )
+
+    def settlements(
+        self, mode: str = GREEDY, time_budget: float = 0.25, expenses: List[Dict] = ()
+    ) -> Tuple[List[Dict], str]:
+        """Exact settlement transactions in major units, plus the algorithm used"""
+        return self.settlement_solver(mode, time_budget)(expenses)
+
+    def settlement_solver(
+        self, mode: str = GREEDY, time_budget: float = 0.25
+    ) -> Callable[..., Tuple[List[Dict], str]]:
+        """settlements as a function of the expenses, over today's balances.
+
+        The balances are taken when this is called, so the solver no longer
+        touches the ledger and may run on another thread.
+        """
+        balances = self._minor_balances()
+        exponent = self._exponent
+
+        def solve(expenses: List[Dict] = ()):
+            settlements, algorithm = solve_settlements(
+                balances, mode, time_budget, expenses, exponent
+            )
+            for settlement in settlements:
+                settlement["amount"] = from_minor(settlement["amount"], exponent)
+            return settlements, algorithm
+
+        return solve
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .money import currency_exponent, from_minor
+from .settlement_solver import GREEDY, solve_settlements
+from .vectorized_balances import participant_balances_minor
+
+# Trips per worker task; amortizes pickling and scheduling over small trips
+CHUNK_SIZE = 32
+
+
+def compact_trip(trip: Dict, converter=None) -> Tuple:
+    """Pack a loaded trip into the minimal tuple a worker needs.
+
+    Participants become positions in two parallel tuples, and each expense
+    refers to them by index instead of repeating uuid strings. Amounts are
+    converted to the trip currency here, so workers need no rate table.
+    """
+    currency = trip.get("currency", "")
+    expenses = trip["expenses"]
+    if converter is not None:
+        expenses = converter.convert_expenses(expenses, currency)
+
+    ids = tuple(p["id"] for p in trip["participants"])
+    names = tuple(p["name"] for p in trip["participants"])
+    column = {pid: i for i, pid in enumerate(ids)}
+
+    packed = tuple(
+        (
+            expense.get("id", ""),
+            expense.get("amount", 0),
+            column.get(expense.get("paid_by"), -1),
+            expense.get("split_type", "equal"),
+            tuple(column[pid] for pid in expense.get("excluded", []) if pid in column),
+            _pack_split_data(expense, column),
+        )
+        for expense in expenses
+    )
+    return trip["id"], currency, ids, names, packed
+
+
+def _pack_split_data(expense, column):
+    """split_data with participant ids swapped for indices, as tuples"""
+    data = expense.get("split_data")
+    if not data:
+        return None
+    if expense.get("split_type") == "itemized":
+        return tuple(
+            (amount, tuple(column[pid] for pid in ids if pid in column))
+            for amount, ids in data.get("items", [])
+        )
+    return tuple(
+        (column[pid], value)
+        for pid, value in zip(data.get("ids", []), data.get("values", []))
+        if pid in column
+    )
+
+
+def _unpack_split_data(packed, split_type, ids):
+    if packed is None:
+        return None
+    if split_type == "itemized":
+        return {"items": [[amount, [ids[i] for i in line]] for amount, line in packed]}
+    return {"ids": [ids[i] for i, _ in packed], "values": [v for _, v in packed]}
+
+
+def settle_compact_trip(payload: Tuple, mode: str, time_budget: float) -> Dict:
+    """Balances and settlements of one compact trip, in major units"""
+    trip_id, currency, ids, names, packed = payload
+    participants = [{"id": pid, "name": name} for pid, name in zip(ids, names)]
+    expenses = [
+        {
+            "id": expense_id,
+            "amount": amount,
+            "paid_by": ids[payer] if payer >= 0 else None,
+            "split_type": split_type,
+            "excluded": [ids[i] for i in excluded],
+            "split_data": _unpack_split_data(split_data, split_type, ids),
+        }
+        for expense_id, amount, payer, split_type, excluded, split_data in packed
+    ]
+
+    exponent = currency_exponent(currency)
+    balances = participant_balances_minor(participants, expenses, exponent)
+    settlements, algorithm = solve_settlements(
+        balances, mode, time_budget, expenses, exponent
+    )
+    for data in balances.values():
+        for key in ("total_paid", "should_pay", "balance"):
+            data[key] = from_minor(data[key], exponent)
+    for settlement in settlements:
+        settlement["amount"] = from_minor(settlement["amount"], exponent)
+
+    return {
+        "trip_id": trip_id,
+        "balances": balances,
+        "settlements": settlements,
+        "algorithm": algorithm,
+    }
+
+
+def _settle_chunk(payloads: List[Tuple], mode: str, time_budget: float):
+    return [settle_compact_trip(payload, mode, time_budget) for payload in payloads]
+
+
+def batch_settle(
+    payloads: Iterable[Tuple],
+    mode: str = GREEDY,
+    time_budget: float = 0.25,
+    max_workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Dict]:
+    """Settle many compact trips on a process pool, yielding as they finish.
+
+    Payloads are drawn from the iterable only as workers free up, at most
+    two chunks per worker ahead, so a lazy iterable never has every trip
+    in memory at once. Workers are spawned rather than forked, since
+    forking a process that runs Qt threads is unsafe.
+    """
+    payloads = iter(payloads)
+    workers = max_workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = set()
+        while True:
+            chunk = list(islice(payloads, chunk_size))
+            if not chunk:
+                break
+            pending.add(pool.submit(_settle_chunk, chunk, mode, time_budget))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in as_completed(pending):
+            yield from future.result()
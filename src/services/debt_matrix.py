@@ -0,0 +1,88 @@
+from typing import Dict, List
+
+from .money import from_minor
+from .split_strategies import expense_allocation
+
+
+class DebtMatrix:
+    """Sparse pairwise debts of one trip before any netting, in minor units.
+
+    ``rows[i][j]`` is what participant i owes participant j for the expenses
+    j paid and i shared. Only non-zero pairs are stored, keyed by participant
+    index, and each expense change touches just the people it is split
+    between.
+    """
+
+    def __init__(self, participants: List[Dict], exponent: int):
+        self._exponent = exponent
+        self._names = {p["id"]: p["name"] for p in participants}
+        self.ids = [p["id"] for p in participants]
+        self._index = {pid: i for i, pid in enumerate(self.ids)}
+        self.rows = {}
+
+    def add_expense(self, expense: Dict):
+        self._apply(expense, 1)
+
+    def remove_expense(self, expense: Dict):
+        self._apply(expense, -1)
+
+    def _apply(self, expense: Dict, sign: int):
+        creditor = self._index.get(expense.get("paid_by"))
+        if creditor is None:
+            return
+
+        indices, shares = expense_allocation(expense, self._index, self._exponent)
+        for debtor, share in zip(indices, shares):
+            if debtor == creditor or not share:
+                continue
+            row = self.rows.setdefault(debtor, {})
+            amount = row.get(creditor, 0) + sign * share
+            if amount:
+                row[creditor] = amount
+            else:
+                del row[creditor]
+                if not row:
+                    del self.rows[debtor]
+
+    def load_dense(self, owed_to):
+        """Replace every pair from a dense owed_to[creditor, debtor] array"""
+        self.rows = {}
+        for creditor, debtor in zip(*owed_to.nonzero()):
+            if creditor != debtor:
+                row = self.rows.setdefault(int(debtor), {})
+                row[int(creditor)] = int(owed_to[creditor, debtor])
+
+    def owed_minor(self, debtor: int, creditor: int) -> int:
+        return self.rows.get(debtor, {}).get(creditor, 0)
+
+    def owed(self, debtor_id: str, creditor_id: str) -> float:
+        """What one participant owes another in major units, before netting"""
+        debtor = self._index.get(debtor_id)
+        creditor = self._index.get(creditor_id)
+        if debtor is None or creditor is None:
+            return 0.0
+        return from_minor(self.owed_minor(debtor, creditor), self._exponent)
+
+    def entries(self) -> List[Dict]:
+        """Every non-zero pair as from/to/amount dicts in major units"""
+        return [
+            {
+                "from_id": self.ids[debtor],
+                "from_name": self._names[self.ids[debtor]],
+                "to_id": self.ids[creditor],
+                "to_name": self._names[self.ids[creditor]],
+                "amount": from_minor(amount, self._exponent),
+            }
+            for debtor, row in sorted(self.rows.items())
+            for creditor, amount in sorted(row.items())
+        ]
+
+    def rename_participant(self, participant_id: str, name: str):
+        if participant_id in self._names:
+            self._names[participant_id] = name
+
+    def name_of(self, index: int) -> str:
+        return self._names[self.ids[index]]
+
+    def to_major(self, units: int) -> float:
+        return from_minor(units, self._exponent)
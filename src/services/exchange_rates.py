@@ -0,0 +1,159 @@
+import bisect
+import csv
+from collections import OrderedDict
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Dict, List, Optional
+
+from .money import currency_exponent
+
+CSV_FIELDS = ["date", "from", "to", "rate"]
+
+
+class RateTable:
+    """Dated exchange rates, read from local CSV files with no network access.
+
+    Each row says one unit of ``from`` was worth ``rate`` units of ``to`` from
+    ``date`` (YYYY-MM-DD) onwards. Every currency pair keeps parallel sorted
+    lists of dates and rates, so a lookup is a bisect.
+    """
+
+    def __init__(self):
+        self._pairs: Dict[tuple, tuple] = {}
+        self._neighbours: Dict[str, set] = {}
+
+    def add(self, day: str, source: str, target: str, rate: Decimal):
+        self._neighbours.setdefault(source, set()).add(target)
+        self._neighbours.setdefault(target, set()).add(source)
+        dates, rates = self._pairs.setdefault((source, target), ([], []))
+        i = bisect.bisect_left(dates, day)
+        if i < len(dates) and dates[i] == day:
+            rates[i] = rate
+        else:
+            dates.insert(i, day)
+            rates.insert(i, rate)
+
+    def load_csv(self, path) -> int:
+        """Merge the rows of a date,from,to,rate CSV file; returns rows read"""
+        count = 0
+        skipped = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() == "date":
+                    continue
+                try:
+                    day, source, target, rate = (field.strip() for field in row[:4])
+                    rate = Decimal(rate)
+                except (ValueError, InvalidOperation):
+                    skipped += 1
+                    continue
+                if len(day) != 10 or rate <= 0:
+                    skipped += 1
+                    continue
+                self.add(day, source.upper(), target.upper(), rate)
+                count += 1
+        if skipped:
+            print(f"Warning: Skipped {skipped} malformed rows in {path}")
+        return count
+
+    def save_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for (source, target), (dates, rates) in sorted(self._pairs.items()):
+                for day, rate in zip(dates, rates):
+                    writer.writerow([day, source, target, str(rate)])
+
+    def _lookup(self, source: str, target: str, day: str) -> Optional[Decimal]:
+        pair = self._pairs.get((source, target))
+        if pair is None:
+            return None
+        dates, rates = pair
+        # Latest rate on or before the day; days before the table use the first
+        i = bisect.bisect_right(dates, day)
+        return rates[max(i - 1, 0)]
+
+    def _direct(self, source: str, target: str, day: str) -> Optional[Decimal]:
+        rate = self._lookup(source, target, day)
+        if rate is not None:
+            return rate
+        inverse = self._lookup(target, source, day)
+        return 1 / inverse if inverse is not None else None
+
+    def rate(self, source: str, target: str, day: str) -> Optional[Decimal]:
+        """Units of target per unit of source on a day, or None if unknown.
+
+        Pairs missing from the table are crossed through one shared currency.
+        """
+        if source == target:
+            return Decimal(1)
+        rate = self._direct(source, target, day)
+        if rate is not None:
+            return rate
+        shared = self._neighbours.get(source, set()) & self._neighbours.get(
+            target, set()
+        )
+        if not shared:
+            return None
+        pivot = min(shared)
+        return self._direct(source, pivot, day) * self._direct(pivot, target, day)
+
+
+class CurrencyConverter:
+    """Converts expense amounts into a trip's currency.
+
+    Converted amounts are kept in an LRU cache, and whole expense lists are
+    converted with one rate lookup per (currency, day) group.
+    """
+
+    def __init__(self, table: RateTable, cache_size: int = 4096):
+        self.table = table
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._missing = set()
+
+    def clear(self):
+        """Forget cached conversions, e.g. after the rate table changed"""
+        self._cache.clear()
+        self._missing.clear()
+
+    def _convert(self, amount, rate: Decimal, target: str, key) -> float:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        places = Decimal(1).scaleb(-currency_exponent(target))
+        converted = (Decimal(str(amount)) * rate).quantize(places, ROUND_HALF_UP)
+        value = self._cache[key] = float(converted)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def convert_expenses(self, expenses: List[Dict], currency: str) -> List[Dict]:
+        """The expenses with every amount in the given currency.
+
+        Expenses already in that currency are returned as they are; others
+        are copied with a converted amount. Amounts with no known rate are
+        left unconverted, with one warning per currency pair.
+        """
+        converted = list(expenses)
+        groups = {}
+        for i, expense in enumerate(expenses):
+            source = expense.get("currency") or currency
+            if source != currency:
+                day = expense.get("created_at", "")[:10]
+                groups.setdefault((source, day), []).append(i)
+
+        for (source, day), indices in groups.items():
+            rate = self.table.rate(source, currency, day)
+            if rate is None:
+                if (source, currency) not in self._missing:
+                    self._missing.add((source, currency))
+                    print(f"Warning: No exchange rate from {source} to {currency}")
+                continue
+            for i in indices:
+                amount = expenses[i].get("amount", 0)
+                key = (amount, source, currency, day)
+                converted[i] = dict(
+                    expenses[i], amount=self._convert(amount, rate, currency, key)
+                )
+        return converted
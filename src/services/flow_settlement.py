@@ -0,0 +1,187 @@
+import heapq
+from typing import Dict, List
+
+from .money import DEFAULT_EXPONENT
+from .split_strategies import expense_allocation
+
+INFINITY = float("inf")
+
+
+class _FlowNetwork:
+    """Residual graph stored as forward-star adjacency arrays.
+
+    Edge e goes to ``to[e]`` and its reverse is ``e ^ 1``; ``first[v]`` and
+    ``next_edge[e]`` chain the edges leaving each vertex.
+    """
+
+    def __init__(self, n_vertices: int):
+        self.first = [-1] * n_vertices
+        self.to = []
+        self.cap = []
+        self.cost = []
+        self.next_edge = []
+
+    def add_edge(self, u: int, v: int, cap, cost: int) -> int:
+        edge = len(self.to)
+        for a, b, c, w in ((u, v, cap, cost), (v, u, 0, -cost)):
+            self.to.append(b)
+            self.cap.append(c)
+            self.cost.append(w)
+            self.next_edge.append(self.first[a])
+            self.first[a] = len(self.to) - 1
+        return edge
+
+    def min_cost_flow(self, source: int, sink: int):
+        """Primal-dual min-cost flow.
+
+        Each Dijkstra pass on reduced costs updates the vertex potentials, then
+        a blocking flow is pushed through the edges whose reduced cost is zero,
+        so one pass serves many augmenting paths.
+        """
+        potential = [0] * len(self.first)
+        while self._update_potentials(source, sink, potential):
+            self._blocking_flow(source, sink, potential)
+
+    def _update_potentials(self, source: int, sink: int, potential) -> bool:
+        n = len(self.first)
+        dist = [INFINITY] * n
+        dist[source] = 0
+        queue = [(0, source)]
+        while queue:
+            d, u = heapq.heappop(queue)
+            if d > dist[u]:
+                continue
+            edge = self.first[u]
+            while edge != -1:
+                v = self.to[edge]
+                if self.cap[edge] > 0:
+                    nd = d + self.cost[edge] + potential[u] - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(queue, (nd, v))
+                edge = self.next_edge[edge]
+
+        if dist[sink] == INFINITY:
+            return False
+        for v in range(n):
+            # Capping at the sink distance keeps every reduced cost non-negative
+            potential[v] += min(dist[v], dist[sink])
+        return True
+
+    def _blocking_flow(self, source: int, sink: int, potential):
+        """Push flow along zero reduced-cost paths until none is found.
+
+        Each vertex keeps a pointer to its next untried edge, so edges that
+        lead nowhere are skipped for the rest of the pass. Paths missed
+        because of that are picked up by the next Dijkstra pass.
+        """
+        current = list(self.first)
+        on_path = [False] * len(self.first)
+        on_path[source] = True
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                push = min(self.cap[edge] for edge in path)
+                for edge in path:
+                    self.cap[edge] -= push
+                    self.cap[edge ^ 1] += push
+                    on_path[self.to[edge]] = False
+                path = []
+                u = source
+                continue
+
+            edge = current[u]
+            while edge != -1:
+                v = self.to[edge]
+                if (
+                    not on_path[v]
+                    and self.cap[edge] > 0
+                    and self.cost[edge] + potential[u] - potential[v] == 0
+                ):
+                    break
+                edge = self.next_edge[edge]
+            current[u] = edge
+
+            if edge != -1:
+                path.append(edge)
+                u = self.to[edge]
+                on_path[u] = True
+            elif path:
+                # Dead end: retreat and skip the edge that led here
+                edge = path.pop()
+                on_path[u] = False
+                u = self.to[edge ^ 1]
+                current[u] = self.next_edge[edge]
+            else:
+                return
+
+
+def shared_expense_pairs(
+    participant_ids: List[str], expenses: List[Dict], exponent: int
+):
+    """Index pairs (payer, sharer) of everyone who split an expense.
+
+    Exact splits are weighted in minor units of the trip currency, so the
+    exponent must match it for small parts to count.
+    """
+    column = {pid: i for i, pid in enumerate(participant_ids)}
+    pairs = set()
+    for expense in expenses:
+        payer = column.get(expense.get("paid_by"))
+        if payer is None:
+            continue
+        members, _ = expense_allocation(expense, column, exponent)
+        for i in members:
+            if i != payer:
+                pairs.add((min(payer, i), max(payer, i)))
+    return pairs
+
+
+def graph_settlement_transactions(
+    balances: Dict[str, Dict], expenses: List[Dict], exponent: int = DEFAULT_EXPONENT
+) -> List[Dict]:
+    """Settle integer balances using only transfers between people who shared
+    an expense, moving as little money in total as possible.
+
+    Every unit of debt is routed from a debtor to a creditor through the
+    shared-expense graph at a cost of one per hop, and the min-cost flow
+    decides the routes. Net flow on each edge becomes one transfer.
+    """
+    ids = list(balances)
+    source, sink = len(ids), len(ids) + 1
+    network = _FlowNetwork(len(ids) + 2)
+
+    for i, pid in enumerate(ids):
+        balance = balances[pid]["balance"]
+        if balance < 0:
+            network.add_edge(source, i, -balance, 0)
+        elif balance > 0:
+            network.add_edge(i, sink, balance, 0)
+
+    pair_edges = []
+    for u, v in shared_expense_pairs(ids, expenses, exponent):
+        forward = network.add_edge(u, v, INFINITY, 1)
+        backward = network.add_edge(v, u, INFINITY, 1)
+        pair_edges.append((u, v, forward, backward))
+
+    network.min_cost_flow(source, sink)
+
+    settlements = []
+    for u, v, forward, backward in pair_edges:
+        # Flow on an edge shows up as capacity on its reverse
+        net = network.cap[forward ^ 1] - network.cap[backward ^ 1]
+        if net == 0:
+            continue
+        payer, payee = (u, v) if net > 0 else (v, u)
+        settlements.append(
+            {
+                "from_id": ids[payer],
+                "from_name": balances[ids[payer]]["name"],
+                "to_id": ids[payee],
+                "to_name": balances[ids[payee]]["name"],
+                "amount": abs(net),
+            }
+        )
+    settlements.sort(key=lambda s: -s["amount"])
+    return settlements
@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List
+
+from .money import currency_exponent, from_minor
+from .settlement_solver import GRAPH, GREEDY, solve_settlements
+
+
+def aggregate_person_balances(ledgers: Iterable) -> Dict[str, Dict[str, Dict]]:
+    """Net the balances of linked people over several trips' BalanceLedgers.
+
+    Each ledger already holds its totals, so this is O(participants) per trip.
+    Trips in different currencies are kept apart: the result maps currency
+    to {person_id: {"name", "balance"}} in minor units.
+    """
+    totals = {}
+    for ledger in ledgers:
+        people = totals.setdefault(ledger.currency, {})
+        for person_id, (name, balance) in ledger.person_balances_minor().items():
+            entry = people.setdefault(person_id, {"name": name, "balance": 0})
+            entry["balance"] += balance
+    return totals
+
+
+def global_balances(totals: Dict[str, Dict[str, Dict]]) -> List[Dict]:
+    """Flatten aggregated totals into rows in major units"""
+    rows = []
+    for currency, people in totals.items():
+        exponent = currency_exponent(currency)
+        for person_id, data in people.items():
+            rows.append(
+                {
+                    "person_id": person_id,
+                    "name": data["name"],
+                    "currency": currency,
+                    "balance": from_minor(data["balance"], exponent),
+                }
+            )
+    return rows
+
+
+def global_settlements(
+    totals: Dict[str, Dict[str, Dict]], mode: str, time_budget: float
+) -> List[Dict]:
+    """One consolidated settle-up per currency over the aggregated totals"""
+    if mode == GRAPH:
+        # Shared-expense links are per trip, so they do not constrain a season
+        mode = GREEDY
+
+    settlements = []
+    for currency, people in totals.items():
+        exponent = currency_exponent(currency)
+        transactions, _ = solve_settlements(people, mode, time_budget)
+        for transaction in transactions:
+            transaction["amount"] = from_minor(transaction["amount"], exponent)
+            transaction["currency"] = currency
+        settlements.extend(transactions)
+    return settlements
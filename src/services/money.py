@@ -0,0 +1,99 @@
+import heapq
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# ISO 4217 minor-unit exponents; anything not listed uses 2
+CURRENCY_EXPONENTS = {"JPY": 0, "KRW": 0, "BHD": 3, "KWD": 3}
+DEFAULT_EXPONENT = 2
+
+
+def currency_exponent(code: str) -> int:
+    """Number of decimal places in the currency's minor unit"""
+    return CURRENCY_EXPONENTS.get(code, DEFAULT_EXPONENT)
+
+
+def to_minor(amount, exponent: int) -> int:
+    """Convert a major-unit amount to integer minor units, rounding half up"""
+    if isinstance(amount, int):
+        return amount * 10**exponent
+    units = Decimal(str(amount)).scaleb(exponent)
+    return int(units.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_minor(units: int, exponent: int) -> float:
+    return units / 10**exponent
+
+
+def allocate(total: int, weights: Sequence[int], offset: int = 0) -> List[int]:
+    """Split total into integer parts proportional to weights.
+
+    Uses largest-remainder allocation, so the parts always add up to total.
+    Ties in the remainder go to the earliest weights, counting from offset.
+    """
+    weight_sum = sum(weights)
+    if not weight_sum:
+        return [0] * len(weights)
+
+    parts = []
+    remainders = []
+    for i, weight in enumerate(weights):
+        part, remainder = divmod(total * weight, weight_sum)
+        parts.append(part)
+        remainders.append((-remainder, (i - offset) % len(weights), i))
+
+    for _, _, i in sorted(remainders)[: total - sum(parts)]:
+        parts[i] += 1
+    return parts
+
+
+# (from_id, from_name, to_id, to_name, amount) of one suggested transfer
+Transfer = Tuple[str, str, str, str, int]
+
+
+def iter_settlement_transactions_minor(balances: Dict[str, Dict]) -> Iterator[Transfer]:
+    """Greedy settlement over integer balances, yielding transfers lazily.
+
+    The heaps are built in O(n) on the first step, and each transfer comes
+    out as soon as it is popped, so large groups need not be settled in full
+    before the first rows can be shown.
+    """
+    creditors = [
+        (-data["balance"], data["name"], pid)
+        for pid, data in balances.items()
+        if data["balance"] > 0
+    ]
+    debtors = [
+        (data["balance"], data["name"], pid)
+        for pid, data in balances.items()
+        if data["balance"] < 0
+    ]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    while creditors and debtors:
+        cred_amt_neg, cred_name, cred_id = heapq.heappop(creditors)
+        debt_amt, debt_name, debt_id = heapq.heappop(debtors)
+        pay_amount = min(-cred_amt_neg, -debt_amt)
+
+        yield debt_id, debt_name, cred_id, cred_name, pay_amount
+
+        if cred_amt_neg + pay_amount < 0:
+            heapq.heappush(creditors, (cred_amt_neg + pay_amount, cred_name, cred_id))
+        if debt_amt + pay_amount < 0:
+            heapq.heappush(debtors, (debt_amt + pay_amount, debt_name, debt_id))
+
+
+def get_settlement_transactions_minor(balances: Dict[str, Dict]) -> List[Dict]:
+    """Greedy settlement over integer balances; needs no tolerance"""
+    return [
+        {
+            "from_id": from_id,
+            "from_name": from_name,
+            "to_id": to_id,
+            "to_name": to_name,
+            "amount": amount,
+        }
+        for from_id, from_name, to_id, to_name, amount in (
+            iter_settlement_transactions_minor(balances)
+        )
+    ]
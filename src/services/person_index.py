@@ -0,0 +1,68 @@
+import unicodedata
+from typing import Dict, List
+
+
+def normalize_name(name: str) -> str:
+    """Case, accent and whitespace insensitive form of a name"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class PersonIndex:
+    """Participants of every trip keyed by normalized name, to suggest links.
+
+    Lookups are dictionary hits on the whole name first, then on its
+    individual words, so suggestions cost no scan over all participants.
+    """
+
+    def __init__(self, participants: List[Dict] = ()):
+        self._by_name: Dict[str, List[Dict]] = {}
+        self._by_word: Dict[str, set] = {}
+        for participant in participants:
+            self.add(participant)
+
+    def add(self, participant: Dict):
+        """Index a participant dict carrying trip_id, id, name and person_id"""
+        key = normalize_name(participant["name"])
+        if not key:
+            return
+        self._by_name.setdefault(key, []).append(participant)
+        for word in key.split():
+            self._by_word.setdefault(word, set()).add(key)
+
+    def suggest(self, name: str, limit: int = 10) -> List[Dict]:
+        """Participants whose name matches, exact matches before word matches"""
+        key = normalize_name(name)
+        if not key:
+            return []
+
+        keys = [key] if key in self._by_name else []
+        related = set()
+        for word in key.split():
+            related.update(self._by_word.get(word, ()))
+        related.discard(key)
+        keys.extend(sorted(related))
+
+        suggestions = []
+        seen_people = set()
+        for match in keys:
+            for participant in self._by_name[match]:
+                person_id = participant.get("person_id")
+                if person_id:
+                    # One entry per person is enough to link to them
+                    if person_id in seen_people:
+                        continue
+                    seen_people.add(person_id)
+                suggestions.append(
+                    {
+                        "trip_id": participant["trip_id"],
+                        "participant_id": participant["id"],
+                        "name": participant["name"],
+                        "person_id": person_id or "",
+                        "exact": match == key,
+                    }
+                )
+                if len(suggestions) >= limit:
+                    return suggestions
+        return suggestions
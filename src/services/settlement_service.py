@@ -1,94 +1,36 @@
-import heapq
 from typing import Dict, List
 
+from .money import from_minor, get_settlement_transactions_minor, to_minor
+from .split_strategies import get_participant_balances_minor
+
 
 def get_participant_balances(
-    participants: List[Dict], expenses: List[Dict]
+    participants: List[Dict], expenses: List[Dict], exponent: int = 2
 ) -> Dict[str, Dict]:
-    """Calculate the balance for each participant based on expenses"""
-    participant_map = {p["id"]: p["name"] for p in participants}
-    balances = {
-        pid: {"name": name, "total_paid": 0.0, "should_pay": 0.0, "balance": 0.0}
-        for pid, name in participant_map.items()
-    }
-
-    for expense in expenses:
-        amount = expense.get("amount", 0.0)
-        paid_by = expense.get("paid_by")
-        split_type = expense.get("split_type", "equal")
-        excluded = set(expense.get("excluded", []))
-
-        # Who participates in this expense?
-        participants = [pid for pid in participant_map if pid not in excluded]
-        participant_count = len(participants) or 1  # avoid division by zero
-
-        # Credit the payer (even if personal)
-        if paid_by and paid_by in balances:
-            balances[paid_by]["total_paid"] += amount
-
-        if split_type == "personal":
-            # Only the payer should pay (if known)
-            if paid_by and paid_by in balances:
-                balances[paid_by]["should_pay"] += amount
-            if paid_by and paid_by not in balances:
-                print(
-                    "Warning: Unknown payer", paid_by, "for expense", expense.get("id")
-                )
-
-        else:  # "equal" (default)
-            share = round(amount / participant_count, 2)
-            for mid in participants:
-                if mid in balances:
-                    balances[mid]["should_pay"] += share
+    """Calculate the balance for each participant, in major units.
 
+    A thin wrapper over get_participant_balances_minor, so the split rules
+    live in one place.
+    """
+    balances = get_participant_balances_minor(participants, expenses, exponent)
     for data in balances.values():
-        data["balance"] = data["total_paid"] - data["should_pay"]
-
+        for key in ("total_paid", "should_pay", "balance"):
+            data[key] = from_minor(data[key], exponent)
     return balances
 
 
-def get_settlement_transactions(balances: Dict[str, Dict]) -> List[Dict]:
-    """Generate settlement transactions to balance accounts"""
-    creditors = []  # max-heap → negative values
-    debtors = []  # max-heap → negative values for abs(debt)
-    TOLERANCE = 0.01
-
-    for pid, data in balances.items():
-        balance = round(data["balance"], 2)
-        if balance > TOLERANCE:
-            heapq.heappush(
-                creditors, (-balance, data["name"], pid)
-            )  # negative = max heap
-        elif balance < -TOLERANCE:
-            heapq.heappush(debtors, (balance, data["name"], pid))  # negative balance
-
-    settlements = []
-
-    while creditors and debtors:
-        cred_amt_neg, cred_name, cred_id = heapq.heappop(creditors)
-        debt_amt, debt_name, debt_id = heapq.heappop(debtors)
-
-        cred_amt = -cred_amt_neg
-        pay_amount = min(cred_amt, -debt_amt)
-
-        settlements.append(
-            {
-                "from_id": debt_id,
-                "from_name": debt_name,
-                "to_id": cred_id,
-                "to_name": cred_name,
-                "amount": round(pay_amount, 2),
-            }
-        )
-
-        # Update amounts
-        cred_amt -= pay_amount
-        debt_amt += pay_amount  # debt_amt becomes less negative
-
-        # Move to next creditor or debtor if settled
-        if cred_amt > 0.01:
-            heapq.heappush(creditors, (-cred_amt, cred_name, cred_id))
-        if debt_amt < -0.01:
-            heapq.heappush(debtors, (debt_amt, debt_name, debt_id))
+def get_settlement_transactions(
+    balances: Dict[str, Dict], exponent: int = 2
+) -> List[Dict]:
+    """Generate settlement transactions to balance accounts, in major units.
 
+    A thin wrapper over get_settlement_transactions_minor.
+    """
+    minor = {
+        pid: {"name": data["name"], "balance": to_minor(data["balance"], exponent)}
+        for pid, data in balances.items()
+    }
+    settlements = get_settlement_transactions_minor(minor)
+    for settlement in settlements:
+        settlement["amount"] = from_minor(settlement["amount"], exponent)
     return settlements
@@ -0,0 +1,165 @@
+import time
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+from .flow_settlement import graph_settlement_transactions
+from .money import DEFAULT_EXPONENT, get_settlement_transactions_minor
+
+# Exact bitmask DP is O(2^n * n); beyond this size use the hashing search
+DP_MAX_PARTICIPANTS = 16
+# The hashing search is O(n^3) in the worst case
+HASH_MAX_PARTICIPANTS = 200
+
+GREEDY = "greedy"
+MINIMAL = "minimal"
+GRAPH = "graph"
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def solve_settlements(
+    balances: Dict[str, Dict],
+    mode: str = GREEDY,
+    time_budget: float = 0.25,
+    expenses: List[Dict] = (),
+    exponent: int = DEFAULT_EXPONENT,
+) -> Tuple[List[Dict], str]:
+    """Settle integer balances and report which algorithm produced the result.
+
+    In "minimal" mode the balances are split into as many zero-sum groups as
+    can be found, and each group is settled on its own. A group of k people
+    needs k - 1 transfers, so every extra group saves one transfer. The
+    search gives up after time_budget seconds and falls back to the greedy
+    heap.
+
+    In "graph" mode transfers are restricted to people who shared one of the
+    given expenses, whose amounts have the given minor-unit exponent; see
+    graph_settlement_transactions.
+    """
+    if mode == GRAPH:
+        transactions = graph_settlement_transactions(balances, expenses, exponent)
+        return transactions, "min-cost-flow"
+    if mode != MINIMAL:
+        return get_settlement_transactions_minor(balances), "greedy"
+
+    debts = {pid: data["balance"] for pid, data in balances.items() if data["balance"]}
+    if sum(debts.values()) != 0:
+        # Unassigned money: there is no exact partition to look for
+        return get_settlement_transactions_minor(balances), "greedy"
+
+    deadline = time.monotonic() + time_budget
+    ids = list(debts)
+    try:
+        if len(ids) <= DP_MAX_PARTICIPANTS:
+            groups = _bitmask_groups([debts[pid] for pid in ids], deadline)
+            algorithm = "bitmask-dp"
+        elif len(ids) <= HASH_MAX_PARTICIPANTS:
+            groups = _hashed_groups([debts[pid] for pid in ids], deadline)
+            algorithm = "subset-hash"
+        else:
+            return get_settlement_transactions_minor(balances), "greedy"
+    except _BudgetExceeded:
+        return get_settlement_transactions_minor(balances), "greedy-fallback"
+
+    settlements = []
+    for group in groups:
+        settlements.extend(
+            get_settlement_transactions_minor({ids[i]: balances[ids[i]] for i in group})
+        )
+    return settlements, algorithm
+
+
+def _check(deadline: float):
+    if time.monotonic() > deadline:
+        raise _BudgetExceeded()
+
+
+def _bitmask_groups(values: List[int], deadline: float) -> List[List[int]]:
+    """Optimal partition into the most zero-sum groups via DP over subsets"""
+    n = len(values)
+    full = (1 << n) - 1
+    sums = [0] * (full + 1)
+    best = [0] * (full + 1)
+
+    for mask in range(1, full + 1):
+        if not mask & 0xFFF:
+            _check(deadline)
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + values[low.bit_length() - 1]
+
+        most = 0
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] > most:
+                most = best[mask ^ bit]
+        best[mask] = most + (sums[mask] == 0)
+
+    # Walk one optimal removal order; zero-sum prefixes delimit the groups
+    groups = []
+    group = []
+    mask = full
+    while mask:
+        target = best[mask] - (sums[mask] == 0)
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] == target:
+                break
+        group.append(bit.bit_length() - 1)
+        mask ^= bit
+        if sums[mask] == 0:
+            groups.append(group)
+            group = []
+    return groups
+
+
+def _hashed_groups(values: List[int], deadline: float) -> List[List[int]]:
+    """Peel off zero-sum subsets of size 2 to 4 using hashed pair sums"""
+    remaining = set(range(len(values)))
+    groups = []
+
+    while len(remaining) > 1:
+        _check(deadline)
+        group = _find_small_zero_sum(values, sorted(remaining), deadline)
+        if not group or len(group) == len(remaining):
+            break
+        groups.append(group)
+        remaining.difference_update(group)
+
+    if remaining:
+        groups.append(sorted(remaining))
+    return groups
+
+
+def _find_small_zero_sum(values: List[int], indices: List[int], deadline: float):
+    seen = {}
+    for i in indices:
+        if -values[i] in seen:
+            return [seen[-values[i]], i]
+        seen.setdefault(values[i], i)
+
+    pair_sums = {}
+    for i, j in combinations(indices, 2):
+        pair_sums.setdefault(values[i] + values[j], []).append((i, j))
+    _check(deadline)
+
+    for k in indices:
+        for i, j in pair_sums.get(-values[k], ()):
+            if k != i and k != j:
+                return [i, j, k]
+    _check(deadline)
+
+    for total, pairs in pair_sums.items():
+        others = pair_sums.get(-total)
+        if not others:
+            continue
+        for i, j in pairs:
+            for k, m in others:
+                if len({i, j, k, m}) == 4:
+                    return [i, j, k, m]
+    return None
@@ -0,0 +1,161 @@
+import zlib
+from typing import Callable, Dict, List, Tuple
+
+from .money import allocate, to_minor
+
+# (participant indices, minor units owed by each); the units sum to the amount
+Allocation = Tuple[List[int], List[int]]
+
+# split_type -> allocator(amount, expense, column, exponent) -> Allocation
+SPLIT_STRATEGIES: Dict[str, Callable[..., Allocation]] = {}
+
+# Fixed-point places used to turn fractional weights into integers
+SHARE_PLACES = 3
+PERCENT_PLACES = 4
+
+
+def split_strategy(name: str):
+    """Register an allocator for a split_type"""
+
+    def register(allocator):
+        SPLIT_STRATEGIES[name] = allocator
+        return allocator
+
+    return register
+
+
+def _rotation(expense: Dict, count: int) -> int:
+    # Rotate who absorbs the leftover units so it is not always the same person
+    return zlib.crc32(str(expense.get("id", "")).encode()) % count
+
+
+@split_strategy("equal")
+def _equal(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    excluded = set(expense.get("excluded", []))
+    indices = [i for pid, i in column.items() if pid not in excluded]
+    if not indices:
+        return [], []
+    return indices, allocate(
+        amount, [1] * len(indices), _rotation(expense, len(indices))
+    )
+
+
+@split_strategy("personal")
+def _personal(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    payer = column.get(expense.get("paid_by"))
+    return ([payer], [amount]) if payer is not None else ([], [])
+
+
+def _weights(expense: Dict, column: Dict[str, int], places: int):
+    """Known participants and their positive weights from split_data"""
+    data = expense.get("split_data") or {}
+    indices = []
+    weights = []
+    for pid, value in zip(data.get("ids", []), data.get("values", [])):
+        weight = to_minor(value, places)
+        if pid in column and weight > 0:
+            indices.append(column[pid])
+            weights.append(weight)
+    return indices, weights
+
+
+def _weighted(expense: Dict, column: Dict[str, int], amount: int, places: int):
+    indices, weights = _weights(expense, column, places)
+    if not indices:
+        return [], []
+    return indices, allocate(amount, weights, _rotation(expense, len(indices)))
+
+
+@split_strategy("shares")
+def _shares(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    return _weighted(expense, column, amount, SHARE_PLACES)
+
+
+@split_strategy("percent")
+def _percent(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    # Percentages that do not add up to 100 are scaled to cover the amount
+    return _weighted(expense, column, amount, PERCENT_PLACES)
+
+
+@split_strategy("exact")
+def _exact(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    # Exact parts that add up to the amount come back unchanged; otherwise
+    # they are scaled like weights so the expense is still fully covered
+    return _weighted(expense, column, amount, exponent)
+
+
+@split_strategy("itemized")
+def _itemized(amount: int, expense: Dict, column: Dict[str, int], exponent: int):
+    """Each line is split equally among its people; whatever the lines do
+    not cover (tax, tip, discount) follows each person's subtotal"""
+    subtotals = {}
+    items = (expense.get("split_data") or {}).get("items", [])
+    for line, (line_amount, ids) in enumerate(items):
+        members = [column[pid] for pid in ids if pid in column]
+        if not members:
+            continue
+        offset = (_rotation(expense, len(members)) + line) % len(members)
+        parts = allocate(to_minor(line_amount, exponent), [1] * len(members), offset)
+        for i, part in zip(members, parts):
+            subtotals[i] = subtotals.get(i, 0) + part
+
+    indices = list(subtotals)
+    shares = list(subtotals.values())
+    rest = amount - sum(shares)
+    if rest and any(shares):
+        sign = 1 if rest > 0 else -1
+        extra = allocate(abs(rest), shares, _rotation(expense, len(indices)))
+        shares = [share + sign * part for share, part in zip(shares, extra)]
+    return indices, shares
+
+
+def expense_allocation(
+    expense: Dict, column: Dict[str, int], exponent: int
+) -> Allocation:
+    """Minor units owed per participant index for one expense.
+
+    The allocator is picked once per expense from its split_type; unknown
+    types split equally.
+    """
+    allocator = SPLIT_STRATEGIES.get(expense.get("split_type", "equal"), _equal)
+    return allocator(
+        to_minor(expense.get("amount", 0), exponent), expense, column, exponent
+    )
+
+
+def get_expense_shares_minor(
+    expense: Dict, participant_map: Dict[str, str], exponent: int
+) -> Dict[str, int]:
+    """Minor units each participant owes for one expense; shares sum exactly"""
+    ids = list(participant_map)
+    column = {pid: i for i, pid in enumerate(ids)}
+    indices, shares = expense_allocation(expense, column, exponent)
+    return {ids[i]: share for i, share in zip(indices, shares)}
+
+
+def get_participant_balances_minor(
+    participants: List[Dict], expenses: List[Dict], exponent: int
+) -> Dict[str, Dict]:
+    """Like get_participant_balances, but in integer minor units"""
+    ids = [p["id"] for p in participants]
+    column = {pid: i for i, pid in enumerate(ids)}
+    paid = [0] * len(ids)
+    owed = [0] * len(ids)
+
+    for expense in expenses:
+        payer = column.get(expense.get("paid_by"))
+        if payer is not None:
+            paid[payer] += to_minor(expense.get("amount", 0), exponent)
+        indices, shares = expense_allocation(expense, column, exponent)
+        for i, share in zip(indices, shares):
+            owed[i] += share
+
+    return {
+        p["id"]: {
+            "name": p["name"],
+            "total_paid": paid[i],
+            "should_pay": owed[i],
+            "balance": paid[i] - owed[i],
+        }
+        for i, p in enumerate(participants)
+    }
@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional, Tuple
+
+from .money import to_minor
+from .split_strategies import (
+    SPLIT_STRATEGIES,
+    _equal,
+    _rotation,
+    expense_allocation,
+    get_participant_balances_minor,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; callers fall back to pure Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Below this many expense x participant cells the pure Python loop is faster
+VECTORIZE_MIN_CELLS = 20000
+# Cells (expenses x participants) per block of the share matrix
+BLOCK_CELLS = 1 << 20
+# Largest participants x participants matrix kept dense for pairwise debts
+DENSE_DEBT_CELLS = 1 << 20
+
+
+def should_vectorize(participants: List[Dict], expenses: List[Dict]) -> bool:
+    return HAS_NUMPY and len(participants) * len(expenses) >= VECTORIZE_MIN_CELLS
+
+
+def participant_balances_minor(
+    participants: List[Dict], expenses: List[Dict], exponent: int
+) -> Dict[str, Dict]:
+    """get_participant_balances_minor, vectorized when NumPy pays off"""
+    if not should_vectorize(participants, expenses):
+        return get_participant_balances_minor(participants, expenses, exponent)
+
+    paid, owed, _ = vectorized_totals_minor(participants, expenses, exponent)
+    return {
+        p["id"]: {
+            "name": p["name"],
+            "total_paid": int(paid[i]),
+            "should_pay": int(owed[i]),
+            "balance": int(paid[i] - owed[i]),
+        }
+        for i, p in enumerate(participants)
+    }
+
+
+def vectorized_totals_minor(
+    participants: List[Dict], expenses: List[Dict], exponent: int, debts=False
+) -> Tuple["np.ndarray", "np.ndarray", Optional["np.ndarray"]]:
+    """Paid and owed minor units per participant, in participant order.
+
+    Equal splits are allocated in blocks of a share matrix with the same
+    largest-remainder rule and rotation as the equal allocator, so the
+    units match it exactly; personal expenses are a scatter-add and other
+    split types go through their allocators one by one. With debts, also
+    returns ``owed_to[creditor, debtor]`` before netting, including the
+    diagonal.
+    """
+    ids = [p["id"] for p in participants]
+    column = {pid: i for i, pid in enumerate(ids)}
+    n = len(ids)
+
+    paid = np.zeros(n, dtype=np.int64)
+    owed = np.zeros(n, dtype=np.int64)
+    owed_to = np.zeros((n, n), dtype=np.int64) if debts else None
+
+    amounts = np.empty(len(expenses), dtype=np.int64)
+    payers = np.full(len(expenses), -1, dtype=np.intp)
+    # Equal splits as parallel arrays; exclusions as (row, column) pairs
+    equal_rows = []
+    offsets = []
+    excluded_rows = []
+    excluded_cols = []
+
+    for row, expense in enumerate(expenses):
+        amount = to_minor(expense.get("amount", 0), exponent)
+        payer = column.get(expense.get("paid_by"), -1)
+        amounts[row] = amount
+        payers[row] = payer
+
+        allocator = SPLIT_STRATEGIES.get(expense.get("split_type", "equal"), _equal)
+        if allocator is _equal:
+            excluded = {
+                column[pid] for pid in expense.get("excluded", []) if pid in column
+            }
+            if len(excluded) == n:
+                continue
+            equal_rows.append(row)
+            offsets.append(_rotation(expense, n - len(excluded)))
+            excluded_rows.extend([len(equal_rows) - 1] * len(excluded))
+            excluded_cols.extend(excluded)
+            continue
+
+        indices, shares = expense_allocation(expense, column, exponent)
+        for i, share in zip(indices, shares):
+            owed[i] += share
+            if debts and payer >= 0:
+                owed_to[payer, i] += share
+
+    known = payers >= 0
+    np.add.at(paid, payers[known], amounts[known])
+
+    equal_rows = np.asarray(equal_rows, dtype=np.intp)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    excluded_rows = np.asarray(excluded_rows, dtype=np.intp)
+    excluded_cols = np.asarray(excluded_cols, dtype=np.intp)
+    block = max(1, BLOCK_CELLS // max(1, n))
+
+    for start in range(0, len(equal_rows), block):
+        stop = min(start + block, len(equal_rows))
+        members = np.ones((stop - start, n), dtype=bool)
+        # Exclusions were collected in row order, so each block is a slice
+        lo, hi = np.searchsorted(excluded_rows, [start, stop])
+        members[excluded_rows[lo:hi] - start, excluded_cols[lo:hi]] = False
+
+        rows = equal_rows[start:stop]
+        count = members.sum(axis=1)
+        base, rest = np.divmod(amounts[rows], count)
+        # The first `rest` members counting from the rotation get a unit more
+        position = np.cumsum(members, axis=1) - 1
+        turn = (position - offsets[start:stop, None]) % count[:, None]
+        shares = members * base[:, None] + (members & (turn < rest[:, None]))
+        owed += shares.sum(axis=0)
+
+        if debts:
+            block_payers = payers[rows]
+            for creditor in np.unique(block_payers[block_payers >= 0]):
+                owed_to[creditor] += shares[block_payers == creditor].sum(axis=0)
+
+    return paid, owed, owed_to
@@ -13,9 +13,11 @@ class SettingsManager(QObject):
     themeChanged = Signal()
     currencyChanged = Signal()
     languageChanged = Signal()
+    settlementModeChanged = Signal()
 
     VALID_THEMES = {"system", "light", "dark"}
     VALID_CURRENCIES = {"USD", "EUR", "GBP", "JPY", "NGN", "CAD", "AUD"}
+    VALID_SETTLEMENT_MODES = {"greedy", "minimal", "graph"}
 
     def __init__(self):
         super().__init__()
@@ -24,6 +26,7 @@ class SettingsManager(QObject):
         self._theme = self.settings.value("theme", "system")
         self._currency = self.settings.value("currency", "NGN")
         self._language = self.settings.value("language", "en")
+        self._settlement_mode = self.settings.value("settlement_mode", "greedy")
 
     # Theme property
     @Property(str, notify=themeChanged)
@@ -79,6 +82,25 @@ class SettingsManager(QObject):
     def setLanguage(self, language: str):
         self.language = language
 
+    # Settlement mode property
+    @Property(str, notify=settlementModeChanged)
+    def settlementMode(self):
+        return self._settlement_mode
+
+    @settlementMode.setter
+    def settlementMode(self, value):
+        if self._settlement_mode != value:
+            self._settlement_mode = value
+            self.settings.setValue("settlement_mode", value)
+            self.settlementModeChanged.emit()
+
+    @Slot(str)
+    def setSettlementMode(self, mode: str):
+        if mode not in self.VALID_SETTLEMENT_MODES:
+            print(f"Warning: Invalid settlement mode '{mode}', using 'greedy'")
+            mode = "greedy"
+        self.settlementMode = mode
+
     # Helper methods
     @Slot(result=list)
     def getAvailableCurrencies(self):
@@ -110,3 +132,4 @@ class SettingsManager(QObject):
         self.theme = "system"
         self.currency = "NGN"
         self.language = "en"
+        self.settlementMode = "greedy"
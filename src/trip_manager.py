@@ -1,23 +1,101 @@
 # This Python file uses the following encoding: utf-8
-from PySide6.QtCore import Property, QObject, QSettings, QStandardPaths, Signal, Slot
+from PySide6.QtCore import (
+    Property,
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QSettings,
+    QStandardPaths,
+    QThreadPool,
+    QTimer,
+    QUrl,
+    Signal,
+    Slot,
+)
 from PySide6.QtQml import QmlElement
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import uuid
 
-from .models import ExpenseModel, ParticipantModel, TripFilterProxy, TripModel
-from .services.settlement_service import (
-    get_participant_balances,
-    get_settlement_transactions,
+from .data.trip_journal import TripJournal
+from .data.trip_repository import TripRepository
+from .data.write_behind import WriteBehindStore
+from .models import (
+    BalanceModel,
+    DebtMatrixModel,
+    ExpenseModel,
+    PagedExpenseModel,
+    ParticipantModel,
+    SettlementModel,
+    TripFilterProxy,
+    TripModel,
+)
+from .services.balance_history import BalanceHistory, to_epoch
+from .services.balance_ledger import BalanceLedger
+from .services.batch_settlement import batch_settle, compact_trip
+from .services.exchange_rates import CurrencyConverter, RateTable
+from .services.global_balances import (
+    aggregate_person_balances,
+    global_balances,
+    global_settlements,
 )
+from .services.money import currency_exponent
+from .services.person_index import PersonIndex
+from .services.split_strategies import SPLIT_STRATEGIES
+from .services.settlement_solver import GRAPH, GREEDY
 from .services.share_service import create_pdf
 
+# Mutations that change a trip's participant count on the home page
+_PARTICIPANT_COUNT_OPS = {"set_participants", "add_participant", "delete_participant"}
+
+# Mutations that change who is in which trip, and so the person index
+_PARTICIPANT_OPS = {
+    "add_trip",
+    "delete_trip",
+    "set_participants",
+    "add_participant",
+    "update_participant",
+    "delete_participant",
+}
+
 QML_IMPORT_NAME = "com.expensesplitter.backend"
 QML_IMPORT_MAJOR_VERSION = 1
 QML_IMPORT_MINOR_VERSION = 0
 
 
+class _BatchSettleTask(QRunnable):
+    """Reads, packs and settles trips one at a time, off the GUI thread"""
+
+    def __init__(self, manager, store, trips, mode, time_budget):
+        super().__init__()
+        self._manager = manager
+        self._store = store
+        self._trips = trips
+        self._mode = mode
+        self._time_budget = time_budget
+
+    def _payloads(self):
+        # A converter of its own, as the cache is not thread safe
+        converter = CurrencyConverter(self._manager._rates)
+        for trip_id, currency in self._trips:
+            body = self._store.load_trip(trip_id)
+            yield compact_trip(dict(body, id=trip_id, currency=currency), converter)
+
+    def run(self):
+        total = len(self._trips)
+        try:
+            results = batch_settle(self._payloads(), self._mode, self._time_budget)
+            for done, result in enumerate(results, 1):
+                self._manager.batchTripSettled.emit(result)
+                self._manager.batchProgress.emit(done, total)
+        except Exception as e:
+            print("Warning: Batch settlement failed:", e)
+        finally:
+            self._manager.batchFinished.emit()
+
+
 @QmlElement
 class TripManager(QObject):
     """Backend manager for trips with model integration"""
@@ -26,44 +104,323 @@ class TripManager(QObject):
     activeTripChanged = Signal()
     expensesChanged = Signal()
     participantsChanged = Signal()
+    batchTripSettled = Signal("QVariantMap")
+    batchProgress = Signal(int, int)
+    batchFinished = Signal()
+    saveFailed = Signal(str)
+    settlementsChanged = Signal()
+    # Carries a callback from the store's writer thread to this thread
+    _readDone = Signal(object)
 
     def __init__(self):
         super().__init__()
         self.settings = QSettings("Bells Uni", "ExpenseSplitter")
+        self._store = WriteBehindStore(
+            self._open_repository(),
+            delay_ms=int(self.settings.value("save_delay_ms", 300)),
+            max_retries=int(self.settings.value("save_max_retries", 3)),
+            parent=self,
+        )
+        self._store.saveFailed.connect(self.saveFailed)
         self._trips = []
+        self._hydrated = OrderedDict()
+        self._ledgers = {}
+        self._person_index = None
+        self._revisions = {}
+        self._memo_key = None
+        self._memo = {}
+        self._memo_hits = 0
+        self._memo_misses = 0
+        self._max_resident_expenses = int(
+            self.settings.value("max_resident_expenses", 50000)
+        )
+        # 0 keeps every expense of the active trip in the expense model
+        self._expense_page_size = int(self.settings.value("expense_page_size", 0))
         self._active_trip_id = ""
         self._active_trip = {}
 
+        self._rates = RateTable()
+        if self._rates_path().exists():
+            self._rates.load_csv(self._rates_path())
+        self._converter = CurrencyConverter(
+            self._rates, int(self.settings.value("conversion_cache_size", 4096))
+        )
+
         self.load_trips()
 
         self._source_model = TripModel(self._trips)
         self._proxy_model = TripFilterProxy()
         self._proxy_model.setSourceModel(self._source_model)
 
-        self._expense_model = ExpenseModel()
         self._participant_model = ParticipantModel()
+        if self._expense_page_size > 0:
+            self._expense_model = PagedExpenseModel(
+                self._participant_model,
+                self._expense_page_size,
+                int(self.settings.value("expense_resident_pages", 8)),
+            )
+        else:
+            self._expense_model = ExpenseModel(self._participant_model)
+        self._debt_model = DebtMatrixModel()
+        self._settlement_model = SettlementModel()
+        self._balance_model = BalanceModel()
+        # A mutation may emit several change signals; the derived models are
+        # refreshed once, on the next event loop pass or when read
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._refresh_derived_models)
+        self.expensesChanged.connect(self._refresh_timer.start)
+        self.participantsChanged.connect(self._refresh_timer.start)
+        self.activeTripChanged.connect(self._refresh_timer.start)
 
-    def load_trips(self):
-        """Load trips from storage"""
-        trips_json = self.settings.value("trips", "[]")
+        self._batch_pool = QThreadPool(self)
+        self._batch_pool.setMaxThreadCount(1)
+        self._batch_running = False
+        self.batchFinished.connect(self._on_batch_finished)
+        self._loading = {}
+        self._readDone.connect(self._run_read_callback)
+
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.close)
+
+    @staticmethod
+    def _data_dir() -> Path:
+        base = Path(QStandardPaths.writableLocation(QStandardPaths.AppDataLocation))
+        base.mkdir(parents=True, exist_ok=True)
+        return base
+
+    def _rates_path(self) -> Path:
+        return self._data_dir() / "rates.csv"
+
+    def _open_repository(self):
+        """Open the configured trip store in the app data directory"""
+        base = self._data_dir()
+
+        backend = self.settings.value("storage_backend", "sqlite")
+        if backend == "journal":
+            threshold = int(
+                self.settings.value("journal_compact_bytes", 4 * 1024 * 1024)
+            )
+            generations = int(self.settings.value("snapshot_generations", 3))
+            return TripJournal(
+                base / "journal",
+                compact_threshold=threshold,
+                generations=generations,
+            )
+        if backend != "sqlite":
+            print(f"Warning: Unknown storage backend '{backend}', using 'sqlite'")
+        return TripRepository(base / "trips.db")
+
+    def _migrate_legacy_trips(self):
+        """One-time import of the old QSettings JSON blob into the database"""
+        trips_json = self.settings.value("trips")
+        if trips_json is None:
+            return
         try:
-            self._trips = json.loads(trips_json)
+            trips = json.loads(trips_json)
         except json.JSONDecodeError:
-            self._trips = []
+            print("Warning: Legacy trips data is corrupt, leaving it in place")
+            return
+
+        if self._store.is_empty():
+            self._store.import_trips(trips)
+        self.settings.remove("trips")
+
+    def load_trips(self):
+        """Load the trip index from storage; bodies are loaded on demand"""
+        self._migrate_legacy_trips()
+        self._trips = self._store.load_index()
+        self._hydrated.clear()
 
         if hasattr(self, "_source_model"):
-            self._source_model.refresh()
+            self._source_model.setTrips(self._trips)
 
         self.tripsChanged.emit()
 
-    def save_trips(self):
-        """Save trips to storage"""
-        trips_json = json.dumps(self._trips)
-        self.settings.setValue("trips", trips_json)
+    def save_trips(self, *mutations):
+        """Queue row-level mutations as (op, trip_id, payload) tuples for saving"""
+        for trip_id in {mutation[1] for mutation in mutations}:
+            self._revisions[trip_id] = self._revisions.get(trip_id, 0) + 1
+        if any(op in _PARTICIPANT_OPS for op, _, _ in mutations):
+            self._person_index = None
+        self._store.apply(mutations)
         if hasattr(self, "_source_model"):
-            self._source_model.refresh()
+            for trip_id, keys in self._changed_trip_fields(mutations).items():
+                self._source_model.updateTrip(trip_id, keys)
         self.tripsChanged.emit()
 
+    @staticmethod
+    def _changed_trip_fields(mutations) -> dict:
+        """Trip index fields each trip's mutations may have changed"""
+        changed = {}
+        for op, trip_id, payload in mutations:
+            if op == "update_trip":
+                changed.setdefault(trip_id, set()).update(payload)
+            elif op in _PARTICIPANT_COUNT_OPS:
+                changed.setdefault(trip_id, set()).add("participant_count")
+        return changed
+
+    def _hydrate(self, trip: dict) -> dict:
+        """Make sure a trip's participants and expenses are in memory"""
+        if trip["id"] in self._hydrated:
+            self._hydrated.move_to_end(trip["id"])
+        else:
+            trip.update(self._store.load_trip(trip["id"]))
+            self._hydrated[trip["id"]] = trip
+        self._evict(keep=trip["id"])
+        return trip
+
+    def _evict(self, keep: str = ""):
+        """Drop least recently used trip bodies once over the memory budget.
+
+        The active trip and the trip named by keep stay loaded even if they
+        alone exceed the budget.
+        """
+        resident = sum(
+            len(trip.get("expenses", ())) for trip in self._hydrated.values()
+        )
+        for trip_id in list(self._hydrated):
+            if resident <= self._max_resident_expenses:
+                break
+            if trip_id in (self._active_trip_id, keep):
+                continue
+            trip = self._hydrated.pop(trip_id)
+            resident -= len(trip.pop("expenses", ()))
+            trip["participant_count"] = len(trip.pop("participants"))
+
+    def _expenses_of(self, trip: dict) -> list:
+        """A loaded trip's expenses.
+
+        The active trip keeps no expense list when expenses are paged; its
+        expenses are then read from the store for the caller alone.
+        """
+        if "expenses" in trip:
+            return trip["expenses"]
+        return self._store.load_trip(trip["id"])["expenses"]
+
+    def _ledger(self, trip: dict) -> BalanceLedger:
+        """Get the balance ledger of a loaded trip, rebuilding it if stale.
+
+        The active trip's ledger is rebuilt in the background when its
+        expenses are paged; an empty ledger stands in until then.
+        """
+        ledger = self._ledgers.get(trip["id"])
+        if ledger is not None and ledger.is_consistent(trip["participants"]):
+            return ledger
+        if "expenses" not in trip and trip is self._active_trip:
+            self._load_in_background(trip)
+            return BalanceLedger(trip["participants"], [], trip.get("currency", ""))
+        if ledger is None:
+            ledger = BalanceLedger(
+                trip["participants"],
+                self._expenses_of(trip),
+                trip.get("currency", ""),
+                self._converter,
+            )
+            self._ledgers[trip["id"]] = ledger
+        else:
+            ledger.rebuild(trip["participants"], self._expenses_of(trip))
+        return ledger
+
+    def _loaded_ledger(self, trip: dict) -> BalanceLedger:
+        """A trip's ledger, loading the trip only if no ledger is kept for it.
+
+        Ledgers outlive eviction of the trip body and are dropped whenever
+        the participants change, so a kept one is always current.
+        """
+        ledger = self._ledgers.get(trip["id"])
+        if ledger is None:
+            ledger = self._ledger(self._hydrate(trip))
+        return ledger
+
+    def _refresh_derived_models(self):
+        self._refresh_timer.stop()
+        self._refresh_debt_model()
+        self._refresh_balance_model()
+        self._refresh_settlement_model()
+
+    def _apply_pending_refresh(self):
+        """Apply a refresh that is still pending before a model is handed out"""
+        if self._refresh_timer.isActive():
+            self._refresh_derived_models()
+
+    def _refresh_debt_model(self):
+        """Point the debt matrix model at the active trip's ledger"""
+        if self._active_trip:
+            self._debt_model.setMatrix(self._ledger(self._active_trip).debts)
+        else:
+            self._debt_model.setMatrix(None)
+
+    def _refresh_settlement_model(self):
+        """Stream the active trip's suggested transfers into the model.
+
+        Greedy transfers come straight off the heap as the view pages in;
+        the other modes have to solve the whole trip first.
+        """
+        if not self._active_trip:
+            self._settlement_model.setTransfers(None)
+            self.settlementsChanged.emit()
+            return
+
+        decimals = currency_exponent(self._active_trip.get("currency", ""))
+        if self._settlement_options()[0] == GREEDY:
+            transfers = self._ledger(self._active_trip).iter_settlements()
+        else:
+            transfers = (
+                (s["from_id"], s["from_name"], s["to_id"], s["to_name"], s["amount"])
+                for s in self._settlements()[0]
+            )
+        self._settlement_model.setTransfers(transfers, decimals)
+        self.settlementsChanged.emit()
+
+    @Slot()
+    def refreshSettlements(self):
+        """Re-solve the active trip's settlements, e.g. after the mode changed"""
+        self._refresh_settlement_model()
+
+    def _refresh_balance_model(self):
+        """Patch the balance model with the active trip's current balances"""
+        currency = self._active_trip.get("currency", "")
+        self._balance_model.setBalances(
+            self.participantBalances, currency_exponent(currency)
+        )
+
+    def _memoized(self, name: str, compute):
+        """Cache a derived value of the active trip until its next mutation"""
+        key = (self._active_trip_id, self._revisions.get(self._active_trip_id, 0))
+        if key != self._memo_key:
+            self._memo_key = key
+            self._memo = {}
+
+        if name in self._memo:
+            self._memo_hits += 1
+            return self._memo[name]
+        self._memo_misses += 1
+        value = self._memo[name] = compute()
+        return value
+
+    @Slot(result="QVariantMap")
+    def memoStats(self) -> dict:
+        """Hit/miss counters of the balance and settlement cache"""
+        return {"hits": self._memo_hits, "misses": self._memo_misses}
+
+    def _find_trip(self, trip_id: str) -> dict:
+        return self._source_model.itemOf(trip_id) or {}
+
+    @Slot()
+    def close(self):
+        """Flush pending writes and close the trip store"""
+        # A pending refresh may read expenses from the store
+        self._refresh_timer.stop()
+        self._store.close()
+
+    def _touch(self, trip: dict):
+        """Bump a trip's updated_at and return the matching mutation"""
+        trip["updated_at"] = datetime.now().isoformat()
+        return ("update_trip", trip["id"], {"updated_at": trip["updated_at"]})
+
     @Slot(str)
     def setFilter(self, text: str):
         """QML search field"""
@@ -71,14 +428,121 @@ class TripManager(QObject):
 
     @Slot(str)
     def setActiveTrip(self, trip_id: str):
-        """Set the current active trip and update expense model"""
+        """Set the current active trip and update expense model.
+
+        With paged expenses, the first page is shown straight from the
+        store. Unless the trip's ledger is kept, or the whole trip is in
+        memory and fits one page, the trip is then loaded on the store's
+        writer thread and opened when that finishes.
+        """
         self._active_trip_id = trip_id
+        if self._expense_page_size > 0:
+            self._expense_model.showTrip(self._store, trip_id)
+            trip = self._find_trip(trip_id)
+            if trip and self._opens_slowly(trip):
+                self._active_trip = {}
+                self.activeTripChanged.emit()
+                self.expensesChanged.emit()
+                self._participant_model.setParticipants([])
+                self.participantsChanged.emit()
+                self._load_in_background(trip)
+                return
+        self._open_trip(trip_id)
+
+    def _opens_slowly(self, trip: dict) -> bool:
+        """Whether opening a trip means reading it or building a big ledger"""
+        if trip["id"] in self._ledgers and trip["id"] in self._hydrated:
+            return False
+        resident = trip.get("expenses") if trip["id"] in self._hydrated else None
+        return resident is None or len(resident) > self._expense_page_size
+
+    def _read_in_background(self, read, apply):
+        """Call read(store) on the store's writer thread after queued writes,
+        then apply(result) on this thread; result is None if read raised"""
+
+        def task(store):
+            result = None
+            try:
+                result = read(store)
+            except Exception as e:
+                print("Warning: Background read failed:", e)
+            self._readDone.emit(lambda: apply(result))
+
+        self._store.read_after_writes(task)
+
+    def _run_read_callback(self, callback):
+        callback()
+
+    def _load_in_background(self, trip: dict):
+        """Read a trip and build its ledger off the GUI thread"""
+        trip_id = trip["id"]
+        currency = trip.get("currency", "")
+        revision = self._revisions.get(trip_id, 0)
+        if self._loading.get(trip_id) == revision:
+            return
+        self._loading[trip_id] = revision
+
+        def read(store):
+            body = store.load_trip(trip_id)
+            # A converter of its own, as the cache is not thread safe
+            converter = CurrencyConverter(self._rates)
+            ledger = BalanceLedger(
+                body["participants"], body["expenses"], currency, converter
+            )
+            return body["participants"], ledger
+
+        self._read_in_background(
+            read, lambda result: self._on_trip_loaded(trip_id, revision, result)
+        )
+
+    def _on_trip_loaded(self, trip_id, revision, result):
+        if self._loading.get(trip_id) == revision:
+            del self._loading[trip_id]
+        if trip_id != self._active_trip_id:
+            return
+        trip = self._find_trip(trip_id)
+        if not trip:
+            return
+        current = (
+            result is not None
+            and revision == self._revisions.get(trip_id, 0)
+            and not self._store.is_dirty(trip_id)
+        )
+
+        if self._active_trip:
+            # A rebuild of the open trip's ledger
+            if current:
+                self._ledgers[trip_id] = result[1]
+                self._memo_key = None
+                self.expensesChanged.emit()
+            elif revision != self._revisions.get(trip_id, 0):
+                # Changed meanwhile; refreshing reads the ledger, which asks
+                # for another rebuild
+                self._refresh_timer.start()
+            return
+
+        if not current:
+            # Failed, or the trip changed or failed to save while it was read
+            self._open_trip(trip_id)
+            return
+        participants, ledger = result
+        if trip_id not in self._hydrated:
+            trip["participants"] = participants
+            self._hydrated[trip_id] = trip
+        self._ledgers[trip_id] = ledger
+        self._open_trip(trip_id)
+
+    def _open_trip(self, trip_id: str):
         trip = self.getTripById(trip_id)
         if trip:
+            if self._expense_page_size > 0:
+                # The expense model pages expenses in from the store instead
+                trip.pop("expenses", None)
             self._active_trip = trip
             self.activeTripChanged.emit()
 
-            self._expense_model.setExpenses(trip.get("expenses", []))
+            if self._expense_page_size <= 0:
+                self._expense_model.setExpenses(trip["expenses"])
             self.expensesChanged.emit()
 
             self._participant_model.setParticipants(trip.get("participants", []))
@@ -96,8 +560,13 @@ class TripManager(QObject):
 
     @Property("QVariantMap", notify=activeTripChanged)
     def activeTrip(self):
-        """Get current active trip"""
-        return self._active_trip
+        """Get the header of the current active trip, without its lists"""
+        trip = self._find_trip(self._active_trip_id)
+        return {
+            key: value
+            for key, value in trip.items()
+            if key not in ("participants", "expenses")
+        }
 
     @Property(QObject, notify=tripsChanged)
     def proxyModel(self):
@@ -109,11 +578,34 @@ class TripManager(QObject):
         """Get the model for expenses"""
         return self._expense_model
 
+    @Property(int, notify=expensesChanged)
+    def expenseCount(self):
+        """Number of expenses in the active trip, fetched into views or not"""
+        return self._expense_model.totalCount()
+
     @Property(QObject, notify=participantsChanged)
     def participantModel(self):
         """Get the model for participants"""
         return self._participant_model
 
+    @Property(QObject, notify=participantsChanged)
+    def debtMatrixModel(self):
+        """Get the pairwise debt matrix model"""
+        self._apply_pending_refresh()
+        return self._debt_model
+
+    @Property(QObject, constant=True)
+    def balanceModel(self):
+        """Get the per-participant balance model of the active trip"""
+        self._apply_pending_refresh()
+        return self._balance_model
+
+    @Property(QObject, constant=True)
+    def settlementModel(self):
+        """Get the suggested settlements model, filled in pages"""
+        self._apply_pending_refresh()
+        return self._settlement_model
+
     @Property("QVariantList", notify=participantsChanged)
     def participantsList(self):
         """Get the list of participants"""
@@ -138,71 +630,100 @@ class TripManager(QObject):
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat(),
         }
-        self._trips.append(trip)
-        self.save_trips()
+        # The model shares the trip list and appends to it
+        self._source_model.appendTrip(trip)
+        self._hydrated[trip["id"]] = trip
+        self.save_trips(("add_trip", trip["id"], trip))
         return trip["id"]
 
     @Slot(str, result=bool)
     def deleteTrip(self, trip_id: str):
         """Delete a trip"""
-        for i, trip in enumerate(self._trips):
-            if trip["id"] == trip_id:
-                self._trips.pop(i)
-                self.save_trips()
-
-                if self._active_trip_id == trip_id:
-                    self._active_trip = {}
-                    self._active_trip_id = ""
-                    self.activeTripChanged.emit()
-                return True
-        return False
+        if not self._source_model.removeTrip(trip_id):
+            return False
+
+        self._hydrated.pop(trip_id, None)
+        self._ledgers.pop(trip_id, None)
+        self.save_trips(("delete_trip", trip_id, None))
+
+        if self._active_trip_id == trip_id:
+            self._active_trip = {}
+            self._active_trip_id = ""
+            self.activeTripChanged.emit()
+        return True
 
     @Slot(str, str, "QVariantList", str, result=bool)
     def editTrip(self, trip_id: str, name: str, participants: list, currency: str):
         """Edit a trip's details"""
-        for trip in self._trips:
-            if trip["id"] == trip_id:
-                trip["name"] = name.strip()
-                trip["currency"] = currency
-                trip["participants"] = participants
-                trip["updated_at"] = datetime.now().isoformat()
-                self.save_trips()
-
-                if self._active_trip_id == trip_id:
-                    self.activeTripChanged.emit()
-                    self._participant_model.setParticipants(trip["participants"])
-                    self.participantsChanged.emit()
-                return True
-        return False
+        trip = self._find_trip(trip_id)
+        if not trip:
+            return False
+
+        self._hydrate(trip)
+        # The edit dialog only sends id and name; keep person links
+        people = {p["id"]: p.get("person_id") for p in trip["participants"]}
+        participants = [
+            dict(p, person_id=people[p["id"]]) if people.get(p["id"]) else p
+            for p in participants
+        ]
+        trip["name"] = name.strip()
+        trip["currency"] = currency
+        trip["participants"] = participants
+        trip["updated_at"] = datetime.now().isoformat()
+        self._ledgers.pop(trip_id, None)
+        self.save_trips(
+            (
+                "update_trip",
+                trip_id,
+                {
+                    "name": trip["name"],
+                    "currency": currency,
+                    "updated_at": trip["updated_at"],
+                },
+            ),
+            ("set_participants", trip_id, participants),
+        )
+
+        if self._active_trip_id == trip_id:
+            self.activeTripChanged.emit()
+            self._participant_model.syncParticipants(trip["participants"])
+            self.participantsChanged.emit()
+        return True
 
     @Slot(str, result=str)
     def shareTrip(self, trip_id: str):
         """Share a trip's details"""
-        for trip in self._trips:
-            if trip["id"] == trip_id:
-                base = Path(
-                    QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
-                )
-                path = base / "ExpenseSplitter" / "Shared" / f"{trip['name']}.pdf"
-                path.parent.mkdir(parents=True, exist_ok=True)
+        trip = self._find_trip(trip_id)
+        if not trip:
+            return ""
 
-                balances = get_participant_balances(
-                    trip.get("participants", []), trip.get("expenses", [])
-                )
-                settlements = get_settlement_transactions(balances)
-                create_pdf(trip, balances, settlements, path)
-                return str(path)
-        return ""
+        self._hydrate(trip)
+        base = Path(QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation))
+        path = base / "ExpenseSplitter" / "Shared" / f"{trip['name']}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        expenses = self._expenses_of(trip)
+        balances = self._ledger(trip).balances()
+        settlements, _ = self._ledger(trip).settlements(
+            *self._settlement_options(), expenses
+        )
+        create_pdf(dict(trip, expenses=expenses), balances, settlements, path)
+        return str(path)
 
     @Slot(str, result="QVariantMap")
     def getTripById(self, trip_id):
         """Get a specific trip by ID"""
-        for trip in self._trips:
-            if trip["id"] == trip_id:
-                return trip
-        return {}
+        trip = self._find_trip(trip_id)
+        return self._hydrate(trip) if trip else {}
+
+    @Slot(str, result="QVariantList")
+    def getTripParticipants(self, trip_id: str):
+        """Get the participants of a trip, loading it if needed"""
+        return self.getTripById(trip_id).get("participants", [])
 
     @Slot(str, float, str, str, "QVariantList", result=str)
+    @Slot(str, float, str, str, "QVariantList", "QVariantMap", result=str)
+    @Slot(str, float, str, str, "QVariantList", "QVariantMap", str, result=str)
     def addExpense(
         self,
         title: str,
@@ -210,10 +731,15 @@ class TripManager(QObject):
         participant_id: str,
         split_type: str,
         excluded: list = [],
+        split_data: dict = None,
+        currency: str = "",
     ):
         """Add an expense to a specific trip"""
         if not self._active_trip:
             return ""
+        if split_type not in SPLIT_STRATEGIES:
+            print(f"Warning: Unknown split type '{split_type}'")
+            return ""
 
         expense = {
             "id": str(uuid.uuid4()),
@@ -224,11 +750,17 @@ class TripManager(QObject):
             "excluded": excluded,
             "created_at": datetime.now().isoformat(),
         }
-        self._active_trip["expenses"].append(expense)
-        self._active_trip["updated_at"] = datetime.now().isoformat()
-        self.save_trips()
-
-        self._expense_model.setExpenses(self._active_trip["expenses"])
+        if split_data:
+            expense["split_data"] = split_data
+        if currency and currency != self._active_trip.get("currency"):
+            expense["currency"] = currency
+        self._ledger(self._active_trip).add_expense(expense)
+        # The model shares the trip's expense list and appends to it
+        self._expense_model.appendExpense(expense)
+        self.save_trips(
+            ("add_expense", self._active_trip_id, expense),
+            self._touch(self._active_trip),
+        )
         self.expensesChanged.emit()
 
         return expense["id"]
@@ -239,17 +771,19 @@ class TripManager(QObject):
         if not self._active_trip:
             return False
 
-        for i, expense in enumerate(self._active_trip["expenses"]):
-            if expense["id"] == expense_id:
-                self._active_trip["expenses"].pop(i)
-                self.save_trips()
+        expense = self._find_expense(expense_id)
+        if expense is None:
+            return False
 
-                self._expense_model.setExpenses(self._active_trip["expenses"])
-                self.expensesChanged.emit()
-                return True
-        return False
+        self._ledger(self._active_trip).remove_expense(expense)
+        self._expense_model.removeExpense(expense_id)
+        self.save_trips(("delete_expense", self._active_trip_id, expense_id))
+        self.expensesChanged.emit()
+        return True
 
     @Slot(str, str, float, str, str, "QVariantList", result=bool)
+    @Slot(str, str, float, str, str, "QVariantList", "QVariantMap", result=bool)
+    @Slot(str, str, float, str, str, "QVariantList", "QVariantMap", str, result=bool)
     def editExpense(
         self,
         expense_id: str,
@@ -258,34 +792,57 @@ class TripManager(QObject):
         participant_id: str,
         split_type: str,
         excluded: list,
+        split_data: dict = None,
+        currency: str = "",
     ):
         """Edit an expense in a specific trip"""
         if not self._active_trip:
             return False
+        if split_type not in SPLIT_STRATEGIES:
+            print(f"Warning: Unknown split type '{split_type}'")
+            return False
 
-        for expense in self._active_trip["expenses"]:
-            if expense["id"] == expense_id:
-                expense["title"] = title
-                expense["amount"] = amount
-                expense["paid_by"] = participant_id
-                expense["split_type"] = split_type
-                expense["excluded"] = excluded
-                self._active_trip["updated_at"] = datetime.now().isoformat()
-                self.save_trips()
-
-                self._expense_model.setExpenses(self._active_trip["expenses"])
-                self.expensesChanged.emit()
-                return True
-        return False
+        expense = self._find_expense(expense_id)
+        if expense is None:
+            return False
+
+        ledger = self._ledger(self._active_trip)
+        ledger.remove_expense(expense)
+        before = dict(expense)
+        expense["title"] = title
+        expense["amount"] = amount
+        expense["paid_by"] = participant_id
+        expense["split_type"] = split_type
+        expense["excluded"] = excluded
+        # None rather than a missing key, so stores overwrite old data
+        expense["split_data"] = split_data or None
+        if currency == self._active_trip.get("currency"):
+            currency = ""
+        expense["currency"] = currency or None
+        ledger.add_expense(expense)
+        self.save_trips(
+            ("update_expense", self._active_trip_id, expense),
+            self._touch(self._active_trip),
+        )
+
+        changed = [key for key in expense if expense[key] != before.get(key)]
+        self._expense_model.updateExpense(expense_id, changed)
+        self.expensesChanged.emit()
+        return True
+
+    def _find_expense(self, expense_id: str):
+        """An expense of the active trip, read from the store if not loaded"""
+        expense = self._expense_model.itemOf(expense_id)
+        if expense is None and "expenses" not in self._active_trip:
+            expense = self._store.load_expense(self._active_trip_id, expense_id)
+        return expense
 
     @Property(float, notify=expensesChanged)
     def totalSpent(self):
         """Get total expenses for current trip"""
         if not self._active_trip:
             return 0.0
-        return sum(
-            expense["amount"] for expense in self._active_trip.get("expenses", [])
-        )
+        return self._ledger(self._active_trip).total_spent()
 
     @Slot(str, result=str)
     def addParticipant(self, name: str):
@@ -294,7 +851,9 @@ class TripManager(QObject):
             return ""
 
         participant = {"id": str(uuid.uuid4()), "name": name}
-        self._active_trip["participants"].append(participant)
+        # The model shares the trip's participant list and appends to it
+        self._participant_model.appendParticipant(participant)
+        self._ledgers.pop(self._active_trip_id, None)
 
         # Auto-exclude new participant from all existing expenses
         # new_participant_id = participant["id"]
@@ -304,10 +863,11 @@ class TripManager(QObject):
         #     if new_participant_id not in expense["excluded"]:
         #         expense["excluded"].append(new_participant_id)
 
-        self._active_trip["updated_at"] = datetime.now().isoformat()
-        self.save_trips()
+        self.save_trips(
+            ("add_participant", self._active_trip_id, participant),
+            self._touch(self._active_trip),
+        )
 
-        self._participant_model.setParticipants(self._active_trip["participants"])
         self.participantsChanged.emit()
 
         # self.expensesChanged.emit()
@@ -316,47 +876,83 @@ class TripManager(QObject):
     @Slot(str, result=bool)
     def deleteParticipant(self, participant_id: str):
         """Delete a participant from a trip"""
-        deleted = False
         if not self._active_trip:
-            return deleted
-
-        for i, participant in enumerate(self._active_trip["participants"]):
-            if participant["id"] == participant_id:
-                self._active_trip["participants"].pop(i)
-                self.save_trips()
-
-                self._participant_model.setParticipants(
-                    self._active_trip["participants"]
-                )
-                self.participantsChanged.emit()
-                deleted = True
+            return False
 
+        # The model shares the trip's participant list and removes from it
+        deleted = self._participant_model.removeParticipant(participant_id)
         if deleted:
-            for expense in self._active_trip.get("expenses", []):
-                if "excluded" in expense and participant_id in expense["excluded"]:
-                    expense["excluded"].remove(participant_id)
-            self.save_trips()
+            self._ledgers.pop(self._active_trip_id, None)
+            self.save_trips(
+                ("delete_participant", self._active_trip_id, participant_id)
+            )
+            if "expenses" in self._active_trip:
+                self._drop_exclusions(
+                    self._active_trip_id, participant_id, self._active_trip["expenses"]
+                )
+            else:
+                self._drop_exclusions_in_background(
+                    self._active_trip_id, participant_id
+                )
+            self.participantsChanged.emit()
             self.expensesChanged.emit()
         return deleted
 
+    def _drop_exclusions(self, trip_id: str, participant_id: str, expenses):
+        """Take a deleted participant out of the excluded lists of expenses"""
+        mutations = []
+        for expense in expenses:
+            if "excluded" in expense and participant_id in expense["excluded"]:
+                if trip_id == self._active_trip_id:
+                    # A paged model holds its own copies of loaded expenses
+                    expense = self._expense_model.itemOf(expense["id"]) or expense
+                expense["excluded"].remove(participant_id)
+                if trip_id == self._active_trip_id:
+                    self._expense_model.updateExpense(expense["id"], ["excluded"])
+                mutations.append(("update_expense", trip_id, expense))
+        if mutations:
+            self.save_trips(*mutations)
+
+    def _drop_exclusions_in_background(self, trip_id: str, participant_id: str):
+        revision = self._revisions.get(trip_id, 0)
+
+        def read(store):
+            return [
+                expense
+                for expense in store.load_trip(trip_id)["expenses"]
+                if participant_id in expense.get("excluded", [])
+            ]
+
+        def apply(expenses):
+            if revision != self._revisions.get(trip_id, 0):
+                # An expense may have changed since; read them again
+                self._drop_exclusions_in_background(trip_id, participant_id)
+            elif expenses:
+                self._drop_exclusions(trip_id, participant_id, expenses)
+                self.expensesChanged.emit()
+
+        self._read_in_background(read, apply)
+
     @Slot(str, str, result=bool)
     def editParticipant(self, participant_id: str, name: str):
         """Edit a participant in a specific trip"""
         if not self._active_trip:
             return False
 
-        for participant in self._active_trip["participants"]:
-            if participant["id"] == participant_id:
-                participant["name"] = name
-                self._active_trip["updated_at"] = datetime.now().isoformat()
-                self.save_trips()
+        participant = self._participant_model.itemOf(participant_id)
+        if participant is None:
+            return False
 
-                self._participant_model.setParticipants(
-                    self._active_trip["participants"]
-                )
-                self.participantsChanged.emit()
-                return True
-        return False
+        participant["name"] = name
+        self._ledger(self._active_trip).rename_participant(participant_id, name)
+        self.save_trips(
+            ("update_participant", self._active_trip_id, participant),
+            self._touch(self._active_trip),
+        )
+
+        self._participant_model.updateParticipant(participant_id, ["name"])
+        self.participantsChanged.emit()
+        return True
 
     @Slot(result=str)
     def generateId(self) -> str:
@@ -367,9 +963,9 @@ class TripManager(QObject):
         """Returns a dictionary with balance info for each participant"""
         if not self._active_trip:
             return {}
-        participants = self._active_trip.get("participants", [])
-        expenses = self._active_trip.get("expenses", [])
-        return get_participant_balances(participants, expenses)
+        return self._memoized(
+            "balances", lambda: self._ledger(self._active_trip).balances()
+        )
 
     @Property(float, notify=expensesChanged)
     def averageSharePerPerson(self) -> float:
@@ -377,22 +973,212 @@ class TripManager(QObject):
         balances = self.participantBalances
         if not balances:
             return 0.0
-        total_should_pay = sum(data["should_pay"] for data in balances.values())
-        return total_should_pay / len(balances) if balances else 0.0
+
+        def average():
+            total_should_pay = sum(data["should_pay"] for data in balances.values())
+            return total_should_pay / len(balances)
+
+        return self._memoized("averageShare", average)
 
     @Slot(str, result="QVariantMap")
     def getParticipantBalance(self, participant_id: str) -> dict:
         """Get balance info for a single participant"""
-        all_balances = self.participantBalances
-        return all_balances.get(
-            participant_id,
-            {"name": "Unknown", "total_paid": 0.0, "should_pay": 0.0, "balance": 0.0},
+        return self.participantBalances.get(participant_id) or {
+            "name": "Unknown",
+            "total_paid": 0.0,
+            "should_pay": 0.0,
+            "balance": 0.0,
+        }
+
+    def _history(self) -> BalanceHistory:
+        """Memoized point-in-time index of the active trip"""
+        return self._memoized(
+            "history",
+            lambda: BalanceHistory(
+                self._active_trip["participants"],
+                self._expenses_of(self._active_trip),
+                self._active_trip.get("currency", ""),
+                self._converter,
+            ),
         )
 
+    @staticmethod
+    def _moment(timestamp: str, end_of_day: bool = False) -> int:
+        """Epoch seconds of an ISO date or datetime; a bare date used as an
+        end point covers that whole day"""
+        moment = to_epoch(timestamp)
+        if end_of_day and len(timestamp) == 10:
+            moment += int(timedelta(days=1).total_seconds()) - 1
+        return moment
+
+    @Slot(str, result="QVariantMap")
+    def getBalancesAt(self, timestamp: str) -> dict:
+        """Balances of the active trip counting only expenses up to a date"""
+        if not self._active_trip:
+            return {}
+        return self._history().balances_at(self._moment(timestamp, True))
+
+    @Slot(str, str, result=float)
+    def getSpentBetween(self, start: str, end: str) -> float:
+        """Total spent in the active trip between two dates, both inclusive"""
+        if not self._active_trip:
+            return 0.0
+        return self._history().spent_between(
+            self._moment(start), self._moment(end, True)
+        )
+
+    @Slot(str, str, result=float)
+    def getPairwiseDebt(self, debtor_id: str, creditor_id: str) -> float:
+        """What one participant owes another before balances are netted"""
+        if not self._active_trip:
+            return 0.0
+        return self._ledger(self._active_trip).debts.owed(debtor_id, creditor_id)
+
+    @Slot(result="QVariantList")
+    def getPairwiseDebts(self) -> list:
+        """Every non-zero who-owes-whom pair of the active trip, before netting"""
+        if not self._active_trip:
+            return []
+        return self._ledger(self._active_trip).debts.entries()
+
+    def _people(self) -> PersonIndex:
+        """Name index over the participants of every trip, built on demand"""
+        if self._person_index is None:
+            self._person_index = PersonIndex(self._store.load_participants())
+        return self._person_index
+
+    @Slot(str, result="QVariantList")
+    def suggestPersonLinks(self, name: str) -> list:
+        """Participants of any trip whose name matches, to link as one person"""
+        return self._people().suggest(name)
+
+    @Slot(str, str, result=bool)
+    def linkParticipant(self, participant_id: str, person_id: str):
+        """Link a participant of the active trip to a person; empty unlinks"""
+        if not self._active_trip:
+            return False
+
+        participant = self._participant_model.itemOf(participant_id)
+        if participant is None:
+            return False
+
+        participant["person_id"] = person_id or None
+        self._ledger(self._active_trip).link_person(participant_id, person_id)
+        self.save_trips(("update_participant", self._active_trip_id, participant))
+        self.participantsChanged.emit()
+        return True
+
+    def _person_totals(self, trip_ids: list):
+        """Aggregated per-person totals over the given trips, or all of them"""
+        wanted = set(trip_ids)
+        trips = [trip for trip in self._trips if not wanted or trip["id"] in wanted]
+        return aggregate_person_balances(self._loaded_ledger(trip) for trip in trips)
+
+    @Slot("QVariantList", result="QVariantList")
+    def getGlobalBalances(self, trip_ids: list) -> list:
+        """Net balance of each linked person across the trips (all if empty)"""
+        return global_balances(self._person_totals(trip_ids))
+
+    @Slot("QVariantList", result="QVariantList")
+    def getGlobalSettlements(self, trip_ids: list) -> list:
+        """One settle-up between linked people across the trips (all if empty)"""
+        return global_settlements(
+            self._person_totals(trip_ids), *self._settlement_options()
+        )
+
+    @Slot(result=int)
+    def settleAllTrips(self) -> int:
+        """Settle every trip on a process pool in the background.
+
+        Results arrive one trip at a time through batchTripSettled, with
+        batchProgress after each. Returns the trip count, or -1 if a batch
+        is already running.
+        """
+        if self._batch_running:
+            return -1
+
+        trips = [(trip["id"], trip.get("currency", "")) for trip in self._trips]
+        options = self._settlement_options()
+
+        def start(store):
+            # Runs on the store's writer thread once queued writes are on
+            # disk; the task then reads the store directly
+            self._batch_pool.start(_BatchSettleTask(self, store, trips, *options))
+
+        self._batch_running = True
+        self._store.read_after_writes(start)
+        return len(trips)
+
+    def _on_batch_finished(self):
+        self._batch_running = False
+
+    @Slot(str, result=int)
+    def importExchangeRates(self, path: str) -> int:
+        """Merge a date,from,to,rate CSV file into the stored rate table"""
+        if path.startswith("file:"):
+            path = QUrl(path).toLocalFile()
+        try:
+            count = self._rates.load_csv(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print("Warning: Could not read exchange rates:", e)
+            return 0
+        self._rates.save_csv(self._rates_path())
+
+        # Every converted total may have changed
+        self._converter.clear()
+        self._ledgers.clear()
+        self._memo_key = None
+        self.expensesChanged.emit()
+        return count
+
+    def _settlement_options(self):
+        """Settlement mode and time budget (seconds) from the settings"""
+        mode = self.settings.value("settlement_mode", "greedy")
+        budget_ms = int(self.settings.value("settlement_time_budget_ms", 250))
+        return mode, budget_ms / 1000
+
+    def _settlements(self):
+        """Memoized (settlements, algorithm) pair for the active trip"""
+        options = self._settlement_options()
+        name = f"settlements:{options[0]}:{options[1]}"
+        trip = self._active_trip
+        if options[0] == GRAPH and "expenses" not in trip:
+            # Graph mode reads the expenses themselves; paged ones are read in
+            # the background, with greedy settlements until then
+            return self._memoized(name, lambda: self._graph_settlements_later(name))
+        expenses = trip["expenses"] if options[0] == GRAPH else ()
+        return self._memoized(
+            name, lambda: self._ledger(trip).settlements(*options, expenses)
+        )
+
+    def _graph_settlements_later(self, name: str):
+        """Greedy settlements now; graph ones from the store in the background"""
+        trip_id = self._active_trip_id
+        key = (trip_id, self._revisions.get(trip_id, 0))
+        ledger = self._ledger(self._active_trip)
+        solve = ledger.settlement_solver(*self._settlement_options())
+
+        def apply(result):
+            if result is not None and self._memo_key == key and name in self._memo:
+                self._memo[name] = result
+                self._refresh_settlement_model()
+
+        self._read_in_background(
+            lambda store: solve(store.load_trip(trip_id)["expenses"]), apply
+        )
+        return ledger.settlements(GREEDY, self._settlement_options()[1])
+
     @Slot(result="QVariantList")
     def getSuggestedSettlements(self) -> list:
         """Returns list of suggested payments: who should pay whom how much"""
         balances = self.participantBalances
         if not balances:
             return []
-        return get_settlement_transactions(balances)
+        return self._settlements()[0]
+
+    @Property(str, notify=settlementsChanged)
+    def settlementAlgorithm(self) -> str:
+        """Name of the algorithm that produced the current settlements"""
+        if not self.participantBalances:
+            return ""
+        return self._settlements()[1]
@@ -0,0 +1,121 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src.services import vectorized_balances
+from src.services.balance_ledger import BalanceLedger
+from src.services.settlement_solver import MINIMAL, solve_settlements
+from src.services.split_strategies import get_participant_balances_minor
+
+
+def _trip(participants, expenses, seed):
+    """Participants and expenses covering every split type"""
+    rng = random.Random(seed)
+    people = [{"id": f"p{i}", "name": f"Person {i}"} for i in range(participants)]
+    ids = [p["id"] for p in people]
+    generated = []
+    for i in range(expenses):
+        expense = {
+            "id": f"e{i}",
+            "amount": rng.randint(1, 50000) / 100,
+            "paid_by": rng.choice(ids),
+            "split_type": rng.choice(["equal", "personal", "shares", "percent"]),
+            "excluded": rng.sample(ids, rng.randint(0, participants - 1)),
+        }
+        if expense["split_type"] in ("shares", "percent"):
+            chosen = rng.sample(ids, rng.randint(1, participants))
+            expense["split_data"] = {
+                "ids": chosen,
+                "values": [rng.randint(1, 5) for _ in chosen],
+            }
+        generated.append(expense)
+    return people, generated
+
+
+def _totals(ledger):
+    return {
+        pid: (data["total_paid"], data["should_pay"], data["balance"])
+        for pid, data in ledger.balances().items()
+    }
+
+
+def _expected(balances):
+    return {
+        pid: tuple(data[key] / 100 for key in ("total_paid", "should_pay", "balance"))
+        for pid, data in balances.items()
+    }
+
+
+@pytest.mark.skipif(not vectorized_balances.HAS_NUMPY, reason="needs NumPy")
+def test_ledger_vectorized_and_pure_paths_agree(monkeypatch):
+    people, expenses = _trip(7, 400, seed=1)
+    pure = get_participant_balances_minor(people, expenses, 2)
+    pure_ledger = BalanceLedger(people, expenses, "USD")
+
+    # Force the NumPy path, in blocks smaller than the trip
+    monkeypatch.setattr(vectorized_balances, "VECTORIZE_MIN_CELLS", 1)
+    monkeypatch.setattr(vectorized_balances, "BLOCK_CELLS", 64)
+    assert vectorized_balances.should_vectorize(people, expenses)
+    vectorized = vectorized_balances.participant_balances_minor(people, expenses, 2)
+    vectorized_ledger = BalanceLedger(people, expenses, "USD")
+
+    assert vectorized == pure
+    assert _totals(pure_ledger) == _totals(vectorized_ledger) == _expected(pure)
+    assert pure_ledger.debts.entries() == vectorized_ledger.debts.entries()
+
+
+def test_ledger_deltas_match_a_rebuild():
+    people, expenses = _trip(5, 120, seed=2)
+    ledger = BalanceLedger(people, [], "USD")
+    for expense in expenses:
+        ledger.add_expense(expense)
+    for expense in expenses[::3]:
+        ledger.remove_expense(expense)
+
+    remaining = [e for i, e in enumerate(expenses) if i % 3]
+    expected = get_participant_balances_minor(people, remaining, 2)
+    assert _totals(ledger) == _expected(expected)
+    assert sum(data["balance"] for data in expected.values()) == 0
+
+
+@pytest.mark.parametrize("participants", [12, 40])
+def test_minimal_settlements_net_to_zero_within_the_budget(participants):
+    rng = random.Random(participants)
+    amounts = [rng.randint(-5000, 5000) for _ in range(participants - 1)]
+    amounts.append(-sum(amounts))
+    balances = {
+        f"p{i}": {"name": f"Person {i}", "balance": amount}
+        for i, amount in enumerate(amounts)
+    }
+
+    budget = 0.2
+    started = time.monotonic()
+    settlements, algorithm = solve_settlements(balances, MINIMAL, budget)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < budget + 0.1
+    assert algorithm in ("bitmask-dp", "subset-hash", "greedy-fallback")
+    net = {pid: data["balance"] for pid, data in balances.items()}
+    for settlement in settlements:
+        assert settlement["amount"] > 0
+        net[settlement["from_id"]] += settlement["amount"]
+        net[settlement["to_id"]] -= settlement["amount"]
+    assert not any(net.values())
+    assert len(settlements) < participants
+
+
+def test_minimal_settlements_fall_back_when_the_budget_runs_out():
+    # Enough people that the subset DP checks the clock before finishing
+    amounts = [amount for i in range(1, 8) for amount in (i * 100, -i * 100)]
+    balances = {
+        f"p{i}": {"name": f"Person {i}", "balance": amount}
+        for i, amount in enumerate(amounts)
+    }
+    settlements, algorithm = solve_settlements(balances, MINIMAL, time_budget=0)
+    assert algorithm == "greedy-fallback"
+    assert sum(s["amount"] for s in settlements) == 2800
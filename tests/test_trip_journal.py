@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.data.snapshot_store import SnapshotStore
+from src.data.trip_journal import JOURNAL_FILE, TripJournal
+
+
+def _trip(trip_id):
+    return {
+        "id": trip_id,
+        "name": "Weekend",
+        "currency": "USD",
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00",
+        "participants": [{"id": "a", "name": "Ada"}, {"id": "b", "name": "Ben"}],
+    }
+
+
+def _expense(number):
+    return {
+        "id": f"e{number}",
+        "title": f"Expense {number}",
+        "amount": 10 + number,
+        "paid_by": "a",
+        "split_type": "equal",
+        "excluded": [],
+        "created_at": f"2024-01-01T00:{number:02d}:00",
+    }
+
+
+def _expense_ids(journal, trip_id):
+    return [expense["id"] for expense in journal.load_trip(trip_id)["expenses"]]
+
+
+def test_a_torn_record_at_the_tail_is_dropped_on_replay(tmp_path):
+    journal = TripJournal(tmp_path)
+    journal.apply([("add_trip", "t1", _trip("t1")), ("add_expense", "t1", _expense(1))])
+    journal.close()
+
+    log = tmp_path / JOURNAL_FILE
+    intact = log.stat().st_size
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('[3,"add_expense","t1",{"id":"e2","amo')
+
+    journal = TripJournal(tmp_path)
+    assert _expense_ids(journal, "t1") == ["e1"]
+    assert log.stat().st_size == intact
+
+    # New records start on a clean line and survive the next replay
+    journal.apply([("add_expense", "t1", _expense(3))])
+    journal.close()
+    journal = TripJournal(tmp_path)
+    assert _expense_ids(journal, "t1") == ["e1", "e3"]
+    journal.close()
+
+
+def test_a_corrupt_snapshot_falls_back_to_an_older_generation(tmp_path):
+    store = SnapshotStore(tmp_path, generations=3)
+    for data in (b"first", b"second", b"third"):
+        store.write(data)
+    assert store.read() == b"third"
+
+    newest = tmp_path / "snapshot.0"
+    payload = bytearray(newest.read_bytes())
+    payload[-1] ^= 0xFF
+    newest.write_bytes(bytes(payload))
+    assert store.read() == b"second"
+
+    (tmp_path / "snapshot.1").write_bytes(b"ESNP")
+    assert store.read() == b"first"
+
+    (tmp_path / "snapshot.2").unlink()
+    assert store.read() is None
+
+
+def test_the_journal_replays_past_a_corrupt_snapshot(tmp_path):
+    # A tiny threshold compacts after nearly every write
+    journal = TripJournal(tmp_path, compact_threshold=200, generations=3)
+    journal.apply([("add_trip", "t1", _trip("t1"))])
+    for number in range(1, 9):
+        journal.apply([("add_expense", "t1", _expense(number))])
+    journal.close()
+    expected = _expense_ids(journal, "t1")
+    assert expected == [f"e{number}" for number in range(1, 9)]
+
+    newest = tmp_path / "snapshot.0"
+    newest.write_bytes(newest.read_bytes()[:-1])
+
+    journal = TripJournal(tmp_path, compact_threshold=200, generations=3)
+    assert _expense_ids(journal, "t1") == expected
+    journal.close()
@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Keep QSettings and app data out of the real home; Qt reads these once
+_HOME = tempfile.mkdtemp()
+os.environ["HOME"] = _HOME
+os.environ["XDG_CONFIG_HOME"] = os.path.join(_HOME, "config")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QSettings
+
+from src.trip_manager import TripManager
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+app.setOrganizationName("Bells Uni")
+app.setApplicationName("ExpenseSplitter")
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    settings = QSettings("Bells Uni", "ExpenseSplitter")
+    settings.clear()
+    yield settings
+    settings.clear()
+
+
+def _trip_with_expenses(manager, name, count):
+    trip_id = manager.addTrip(name)
+    manager.setActiveTrip(trip_id)
+    payer = manager.addParticipant("Ada")
+    manager.addParticipant("Ben")
+    for i in range(count):
+        manager.addExpense(f"Expense {i}", 10.0, payer, "equal", [])
+    return trip_id
+
+
+def test_hydrating_a_trip_over_the_budget_keeps_it_loaded(settings):
+    settings.setValue("max_resident_expenses", 5)
+    manager = TripManager()
+    big = _trip_with_expenses(manager, "Big", 8)
+    manager.close()
+
+    manager = TripManager()
+    manager.setActiveTrip(manager.addTrip("Other"))
+    try:
+        assert len(manager.getTripById(big)["expenses"]) == 8
+        participants = manager.getTripParticipants(big)
+        assert [p["name"] for p in participants] == ["Ada", "Ben"]
+        assert manager.editTrip(big, "Bigger", participants, "NGN")
+        # Raised KeyError while the hydrated body was evicted straight away
+        manager.getGlobalBalances([big])
+    finally:
+        manager.close()
+
+
+def test_paged_trip_opens_in_the_background_and_patches_its_pages(settings):
+    settings.setValue("expense_page_size", 3)
+    manager = TripManager()
+    trip_id = _trip_with_expenses(manager, "Paged", 8)
+    manager.close()
+
+    manager = TripManager()
+    try:
+        manager.setActiveTrip(trip_id)
+        deadline = time.monotonic() + 5
+        while not manager.participantsList and time.monotonic() < deadline:
+            app.processEvents()
+        assert manager.totalSpent == 80.0
+
+        model = manager.expenseModel
+        ids = [model.data(model.index(row, 0), model.IdRole) for row in range(3)]
+        reads = []
+        manager._store.load_expense_page = lambda *args: reads.append(args)
+
+        payer = manager.participantsList[0]["id"]
+        new = manager.addExpense("New", 5.0, payer, "equal", [])
+        rows = [model.data(model.index(row, 0), model.IdRole) for row in range(3)]
+        assert rows == [new] + ids[:2]
+        assert manager.deleteExpense(ids[0])
+        rows = [model.data(model.index(row, 0), model.IdRole) for row in range(2)]
+        assert rows == [new, ids[1]]
+        # Both rows were patched into the loaded page, not read again
+        assert reads == []
+        assert manager.expenseCount == 8
+        assert manager.totalSpent == 75.0
+    finally:
+        manager.close()
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+    return condition()
+
+
+def test_paged_trip_rebuilds_balances_and_graph_settlements_in_the_background(
+    settings,
+):
+    settings.setValue("expense_page_size", 3)
+    manager = TripManager()
+    trip_id = _trip_with_expenses(manager, "Paged", 8)
+    manager.close()
+
+    manager = TripManager()
+    try:
+        manager.setActiveTrip(trip_id)
+        assert _wait_until(lambda: manager.participantsList)
+        reads = []
+        manager._store.load_trip = lambda *args: reads.append(args)
+
+        cy = manager.addParticipant("Cy")
+        assert _wait_until(
+            lambda: manager.participantBalances.get(cy, {}).get("should_pay")
+        )
+        balances = manager.participantBalances
+        assert round(sum(b["should_pay"] for b in balances.values()), 2) == 80.0
+        assert manager.totalSpent == 80.0
+
+        settings.setValue("settlement_mode", "graph")
+        manager.refreshSettlements()
+        assert _wait_until(lambda: manager.settlementAlgorithm != "greedy")
+        paid = {pid: 0.0 for pid in balances}
+        for settlement in manager.getSuggestedSettlements():
+            paid[settlement["from_id"]] += settlement["amount"]
+            paid[settlement["to_id"]] -= settlement["amount"]
+        for pid, data in balances.items():
+            assert round(paid[pid] + data["balance"], 2) == 0
+        # Every whole-trip read went through the store's writer thread
+        assert reads == []
+    finally:
+        manager.close()
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PySide6.QtCore import QCoreApplication
+
+from src.data.write_behind import WriteBehindStore
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+class _Store:
+    """Keeps applied mutations; rejects any batch holding a "bad" payload"""
+
+    def __init__(self):
+        self.applied = []
+        self.attempts = 0
+
+    def apply(self, mutations):
+        self.attempts += 1
+        if any(payload.get("bad") for _, _, payload in mutations):
+            raise ValueError("constraint failed")
+        self.applied.extend(mutations)
+
+    def close(self):
+        pass
+
+
+def test_a_mutation_that_always_fails_is_dropped_after_the_retry_cap():
+    store = _Store()
+    writer = WriteBehindStore(store, delay_ms=0, retry_ms=60000, max_retries=2)
+    errors = []
+    writer.saveFailed.connect(errors.append)
+
+    writer.apply(
+        [
+            ("add_expense", "t1", {"id": "a"}),
+            ("add_expense", "t2", {"id": "b", "bad": True}),
+            ("add_expense", "t1", {"id": "c"}),
+        ]
+    )
+    writer.flush()
+    writer.apply([("add_expense", "t1", {"id": "d"})])
+    writer.flush()
+    # Both attempts failed as a whole and kept everything queued, in order
+    assert store.applied == []
+    assert writer.is_dirty("t1")
+
+    writer.flush()
+    app.processEvents()
+    assert [payload["id"] for _, _, payload in store.applied] == ["a", "c", "d"]
+    assert not writer.is_dirty("t1") and not writer.is_dirty("t2")
+    assert len(errors) == 3 and "t2" in errors[-1]
+
+    # The cap applies per failure run; a good batch goes through whole again
+    attempts = store.attempts
+    writer.apply([("add_expense", "t1", {"id": "e"})])
+    writer.flush()
+    assert store.attempts == attempts + 1
+    writer.close()